@@ -1,6 +1,12 @@
+from core.views import MetricsView
+from django.conf import settings
 from django.urls import include, path
+from foodgram.async_views import (AsyncDownloadShoppingCartView,
+                                  AsyncIngredientView, AsyncRecipeView,
+                                  AsyncTagView)
 from foodgram.views import IngredientViewSet, RecipeViewSet, TagViewSet
 from rest_framework.routers import SimpleRouter
+from users.async_views import AsyncSubscriptionsView
 from users.views import CustomUserViewSet
 
 app_name = 'api'
@@ -12,7 +18,39 @@ router.register('tags', TagViewSet, basename='tags')
 router.register('ingredients', IngredientViewSet, basename='ingredients')
 router.register('recipes', RecipeViewSet, basename='recipes')
 
+async_urlpatterns = [
+    path('recipes/', AsyncRecipeView.as_view(
+        action='list',
+        sync_view=RecipeViewSet.as_view(
+            {'get': 'list', 'post': 'create'},
+            basename='recipes', detail=False,
+        ),
+    )),
+    path('recipes/download_shopping_cart/',
+         AsyncDownloadShoppingCartView.as_view(action='download')),
+    path('recipes/<int:pk>/', AsyncRecipeView.as_view(
+        action='retrieve',
+        sync_view=RecipeViewSet.as_view(
+            {'get': 'retrieve', 'put': 'update',
+             'patch': 'partial_update', 'delete': 'destroy'},
+            basename='recipes', detail=True,
+        ),
+    )),
+    path('tags/', AsyncTagView.as_view(action='list')),
+    path('tags/<int:pk>/', AsyncTagView.as_view(action='retrieve')),
+    path('ingredients/', AsyncIngredientView.as_view(action='list')),
+    path('ingredients/<int:pk>/',
+         AsyncIngredientView.as_view(action='retrieve')),
+    path('users/subscriptions/',
+         AsyncSubscriptionsView.as_view(action='list')),
+]
+
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
+if settings.ASYNC_VIEWS:
+    urlpatterns += async_urlpatterns
+urlpatterns += [
     path('', include(router.urls)),
 ]
@@ -0,0 +1,162 @@
+"""
+Бенчмарки API: запускаются отдельно от тестов (setup.cfg, norecursedirs).
+    pytest backend/benchmarks --benchmark-sizes small,medium
+    pytest backend/benchmarks --update-budgets
+"""
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from benchmarks.measure import (BUDGETS_PATH, SIZES, Budgets, get_commit,
+                                measure, summarize)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption(
+        '--benchmark-sizes', default='small',
+        help=f'Размеры данных через запятую: {", ".join(SIZES)}.',
+    )
+    group.addoption('--benchmark-repeat', type=int, default=5)
+    group.addoption('--benchmark-seed', type=int, default=1)
+    group.addoption('--benchmark-budgets', default=BUDGETS_PATH)
+    group.addoption(
+        '--benchmark-report', default=None,
+        help='Путь JSON отчета для сравнения между коммитами.',
+    )
+    group.addoption(
+        '--update-budgets', action='store_true',
+        help='Записать бюджеты по текущим результатам.',
+    )
+
+
+def pytest_configure(config):
+    unknown = set(config.getoption('benchmark_sizes').split(',')) - set(SIZES)
+    if unknown:
+        raise pytest.UsageError(f'Неизвестные размеры: {", ".join(unknown)}')
+
+
+def pytest_generate_tests(metafunc):
+    if 'size' in metafunc.fixturenames:
+        metafunc.parametrize(
+            'size', metafunc.config.getoption('benchmark_sizes').split(','),
+            scope='session',
+        )
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_test_environment, django_db_blocker):
+    """
+    Тестовая база для всех бенчмарков. pytest-django создает ее
+    только для тестов с отметкой django_db, а она оборачивает тест
+    в транзакцию, и запросы на запись замерялись бы с точками
+    сохранения.
+    """
+    with django_db_blocker.unblock():
+        old_config = setup_databases(
+            verbosity=0, interactive=False, serialized_aliases=(),
+        )
+    yield
+    with django_db_blocker.unblock():
+        teardown_databases(old_config, verbosity=0)
+
+
+@pytest.fixture(scope='session')
+def budgets(request, django_db_setup, django_db_blocker):
+    """
+    Бюджеты показателей (benchmarks.measure.Budgets). После всех
+    бенчмарков пишет JSON отчет и, с --update-budgets, новые бюджеты.
+    """
+    config = request.config
+    budgets = Budgets(
+        config.getoption('benchmark_budgets'),
+        update=config.getoption('update_budgets'),
+    )
+    yield budgets
+    report_path = config.getoption('benchmark_report')
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'commit': get_commit(),
+                'created': datetime.now(timezone.utc).isoformat(),
+                'database': connection.vendor,
+                'repeat': config.getoption('benchmark_repeat'),
+                'seed': config.getoption('benchmark_seed'),
+                'results': budgets.results,
+            }, file, ensure_ascii=False, indent=2)
+    if budgets.update:
+        budgets.save()
+
+
+@pytest.fixture
+def run_benchmark(request, budgets):
+    """
+    Замеряет функции 'repeat' раз и еще раз с tracemalloc
+    и сравнивает результаты с бюджетами группы.
+    Функции вызываются по очереди в каждом повторе, поэтому пара
+    удаление - добавление не меняет данные между повторами.
+    :return: Функция (group, calls) -> dict показателей по названиям,
+        calls - dict название -> функция без аргументов. Если функция
+        вернула ответ 4xx или 5xx, бенчмарк падает.
+    """
+    repeat = request.config.getoption('benchmark_repeat')
+
+    def run(group, calls):
+        samples = {name: [] for name in calls}
+        for run in range(repeat + 1):
+            for name, call in calls.items():
+                result, sample = measure(call, trace=run == repeat)
+                status = getattr(result, 'status_code', 200)
+                assert status < 400, f'{name}: ответ {status}'
+                samples[name].append(sample)
+        results = {name: summarize(runs) for name, runs in samples.items()}
+        failures = [
+            failure for name, metrics in results.items()
+            for failure in budgets.check(group, name, metrics)
+        ]
+        assert not failures, '\n'.join(failures)
+        return results
+
+    return run
+
+
+@pytest.fixture(scope='session')
+def dataset(request, size, django_db_setup, django_db_blocker):
+    """
+    Тестовая база, заполненная seed_scale для размера 'size'.
+    Данные остаются в базе до смены размера.
+    """
+    with django_db_blocker.unblock():
+        call_command('flush', interactive=False, verbosity=0)
+        call_command(
+            'seed_scale', seed=request.config.getoption('benchmark_seed'),
+            stdout=StringIO(), **SIZES[size],
+        )
+    yield size
+    with django_db_blocker.unblock():
+        call_command('flush', interactive=False, verbosity=0)
+
+
+@pytest.fixture
+def seeded_db(dataset, django_db_blocker):
+    """
+    Доступ к заполненной базе без транзакции теста: запросы
+    замеряются так же, как в обычном запросе к API.
+    """
+    with django_db_blocker.unblock():
+        yield dataset
+
+
+@pytest.fixture
+def benchmark_db(django_db_setup, django_db_blocker):
+    """
+    Доступ к тестовой базе без транзакции теста для бенчмарков
+    на своих данных. Созданные строки бенчмарк удаляет сам.
+    """
+    with django_db_blocker.unblock():
+        yield
@@ -0,0 +1,214 @@
+import gc
+import json
+import os
+import subprocess
+import tracemalloc
+from statistics import median
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BUDGETS_PATH = os.path.join(settings.BASE_DIR, 'data/benchmark_budgets.json')
+
+SIZES = {
+    'small': {
+        'users': 50, 'recipes': 300, 'tags': 5, 'favorites': 1000,
+        'carts': 200, 'subscriptions': 300,
+    },
+    'medium': {
+        'users': 500, 'recipes': 5000, 'tags': 20, 'favorites': 25000,
+        'carts': 5000, 'subscriptions': 5000,
+    },
+    'large': {
+        'users': 5000, 'recipes': 100000, 'tags': 30,
+        'favorites': 500000, 'carts': 100000, 'subscriptions': 100000,
+    },
+    # Поиск по миллиону рецептов (test_recipe_search.py), PostgreSQL.
+    'xlarge': {
+        'users': 10000, 'recipes': 1000000, 'tags': 30,
+        'favorites': 1000000, 'carts': 100000, 'subscriptions': 100000,
+    },
+}
+
+# Во сколько раз результат при --update-budgets умножается для бюджета.
+# Количество запросов и строк не зависит от машины, время и память зависят.
+HEADROOM = {'queries': 1, 'rows': 1, 'time_ms': 3, 'peak_kb': 2}
+
+
+class RowCountingCursor:
+    """
+    Обертка курсора DB-API, считающая полученные строки.
+    """
+
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        for row in self.cursor:
+            self.counter['rows'] += 1
+            yield row
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.counter['rows'] += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self.cursor.fetchmany(*args, **kwargs)
+        self.counter['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self.counter['rows'] += len(rows)
+        return rows
+
+
+def measure(call, trace=False):
+    """
+    Выполняет call() и возвращает его показатели.
+    Пиковая память считается только при trace=True: tracemalloc
+    замедляет выполнение, поэтому время такого запуска не учитывается.
+    :param call: Функция без аргументов, например запрос клиента.
+    :return: tuple: (результат call(), dict с показателями).
+    """
+    counter = {'rows': 0}
+
+    def count_rows(execute, sql, params, many, context):
+        wrapper = context['cursor']
+        if not isinstance(wrapper.cursor, RowCountingCursor):
+            wrapper.cursor = RowCountingCursor(wrapper.cursor, counter)
+        return execute(sql, params, many, context)
+
+    if trace:
+        # Сборка мусора от предыдущих замеров не должна попасть в этот.
+        gc.collect()
+        tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries, \
+                connection.execute_wrapper(count_rows):
+            started = perf_counter()
+            result = call()
+            elapsed = perf_counter() - started
+        sample = {
+            'time_ms': elapsed * 1000,
+            'queries': len(queries),
+            'rows': counter['rows'],
+        }
+        if trace:
+            sample['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return result, sample
+
+
+def request(client, method, path, data=None, headers=None):
+    """
+    Запрос клиента Django с чтением потокового ответа целиком.
+    :return: HttpResponse.
+    """
+    headers = headers or {}
+    if method == 'get':
+        response = client.get(path, data or {}, **headers)
+    else:
+        response = getattr(client, method)(
+            path, data or {}, content_type='application/json', **headers
+        )
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def summarize(samples):
+    """
+    Сводит повторы одного замера: медиана времени без последнего
+    (с tracemalloc) запуска, максимум запросов и строк, пиковая
+    память последнего запуска.
+    :param samples: list: Показатели из measure(), последний - trace=True.
+    :return: dict.
+    """
+    return {
+        'time_ms': round(median(
+            sample['time_ms'] for sample in samples[:-1]
+        ), 2),
+        'queries': max(sample['queries'] for sample in samples),
+        'rows': max(sample['rows'] for sample in samples),
+        'peak_kb': round(samples[-1]['peak_kb'], 1),
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'), capture_output=True,
+            text=True, cwd=settings.BASE_DIR, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Budgets:
+    """
+    Бюджеты показателей из data/benchmark_budgets.json для текущей
+    базы данных: {группа: {замер: {показатель: предел}}}.
+    Группа - размер данных (small, medium) или название бенчмарка.
+    При update=True результаты не проверяются, а записываются
+    как новые бюджеты с запасом HEADROOM.
+    """
+
+    def __init__(self, path, update=False):
+        self.path = path
+        self.update = update
+        self.results = {}
+        self.all_budgets = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.all_budgets = json.load(file)
+        self.budgets = self.all_budgets.get(connection.vendor, {})
+
+    def check(self, group, name, metrics):
+        """
+        Запоминает результат замера и сравнивает его с бюджетом.
+        :return: list: Описания превышений.
+        """
+        self.results.setdefault(group, {})[name] = metrics
+        if self.update:
+            return []
+        budget = self.budgets.get(group, {}).get(name)
+        if budget is None:
+            return [f'{group}/{name}: нет бюджета']
+        return [
+            f'{group}/{name}: {metric} {value} > {budget[metric]}'
+            for metric, value in metrics.items()
+            if metric in budget and value > budget[metric]
+        ]
+
+    def save(self):
+        """
+        Записывает результаты как бюджеты текущей базы данных.
+        Бюджеты замеров, которые не запускались, остаются прежними.
+        """
+        vendor_budgets = self.all_budgets.setdefault(connection.vendor, {})
+        for group, measurements in self.results.items():
+            vendor_budgets.setdefault(group, {}).update({
+                name: {
+                    metric: (
+                        round(value * HEADROOM[metric], 1)
+                        if isinstance(value, float)
+                        else value * HEADROOM[metric]
+                    )
+                    for metric, value in metrics.items()
+                }
+                for name, metrics in measurements.items()
+            })
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(self.all_budgets, file, ensure_ascii=False, indent=2)
+            file.write('\n')
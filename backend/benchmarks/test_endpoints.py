@@ -0,0 +1,131 @@
+"""
+Эндпоинты из api/urls.py на данных seed_scale разных размеров:
+время, запросы к базе, полученные строки и пиковая память.
+"""
+import pytest
+from django.db.models import Count
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from benchmarks.measure import request
+from foodgram.models import Cart, Favorite, Ingredient, Recipe, Tag
+from users.models import CustomUser, Subscription
+
+# Запросы на запись идут парами (удаление и добавление) в одном
+# бенчмарке, чтобы данные не менялись между повторами.
+ENDPOINTS = (
+    ('users_list',),
+    ('users_detail',),
+    ('users_me',),
+    ('users_subscriptions',),
+    ('users_unsubscribe', 'users_subscribe'),
+    ('tags_list',),
+    ('tags_detail',),
+    ('ingredients_list',),
+    ('ingredients_search',),
+    ('ingredients_detail',),
+    ('recipes_list',),
+    ('recipes_list_last_page',),
+    ('recipes_list_filtered',),
+    ('recipes_list_cursor',),
+    ('recipes_list_popular',),
+    ('recipes_search',),
+    ('recipes_detail',),
+    ('recipes_favorite_delete', 'recipes_favorite'),
+    ('recipes_shopping_cart_delete', 'recipes_shopping_cart'),
+    ('recipes_download_pdf',),
+    ('recipes_download_csv',),
+)
+
+
+@pytest.fixture
+def endpoints(seeded_db):
+    """
+    Параметры эндпоинтов из заполненной базы.
+    :return: tuple: (dict название -> (метод, путь, данные), заголовки).
+    """
+    user = CustomUser.objects.annotate(
+        carts=Count('in_cart')
+    ).order_by('-carts', 'pk').first()
+    recipe = Recipe.objects.order_by('-favorites_count', 'pk').first()
+    author = recipe.author
+    tag = Tag.objects.order_by('pk').first()
+    ingredient = Ingredient.objects.order_by('pk').first()
+    favorite = Favorite.objects.filter(user=user).order_by('pk').first()
+    cart = Cart.objects.filter(user=user).order_by('pk').first()
+    subscription = Subscription.objects.filter(
+        username=user
+    ).order_by('pk').first()
+    word = recipe.name.split()[0]
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+    # Токен в кэше, как у клиента, который уже делал запросы.
+    Client().get('/api/users/me/', **headers)
+    return {
+        'users_list': ('get', '/api/users/', {'limit': 6}),
+        'users_detail': ('get', f'/api/users/{author.pk}/', {}),
+        'users_me': ('get', '/api/users/me/', {}),
+        'users_subscriptions': ('get', '/api/users/subscriptions/',
+                                {'limit': 6, 'recipes_limit': 3}),
+        'users_unsubscribe': (
+            'delete', f'/api/users/{subscription.author_id}/subscribe/', {}
+        ),
+        'users_subscribe': (
+            'post', f'/api/users/{subscription.author_id}/subscribe/', {}
+        ),
+        'tags_list': ('get', '/api/tags/', {}),
+        'tags_detail': ('get', f'/api/tags/{tag.pk}/', {}),
+        'ingredients_list': ('get', '/api/ingredients/', {}),
+        'ingredients_search': ('get', '/api/ingredients/',
+                               {'name': ingredient.name[:2]}),
+        'ingredients_detail': (
+            'get', f'/api/ingredients/{ingredient.pk}/', {}
+        ),
+        'recipes_list': ('get', '/api/recipes/', {'limit': 6}),
+        'recipes_list_last_page': (
+            'get', '/api/recipes/',
+            {'limit': 6, 'page': (Recipe.objects.count() + 5) // 6},
+        ),
+        'recipes_list_filtered': ('get', '/api/recipes/',
+                                  {'limit': 6, 'tags': tag.slug,
+                                   'is_favorited': 1}),
+        'recipes_list_cursor': ('get', '/api/recipes/',
+                                {'limit': 6, 'cursor': ''}),
+        'recipes_list_popular': ('get', '/api/recipes/',
+                                 {'limit': 6, 'ordering': '-favorites_count'}),
+        'recipes_search': ('get', '/api/recipes/',
+                           {'limit': 6, 'search': word}),
+        'recipes_detail': ('get', f'/api/recipes/{recipe.pk}/', {}),
+        'recipes_favorite_delete': (
+            'delete', f'/api/recipes/{favorite.recipe_id}/favorite/', {}
+        ),
+        'recipes_favorite': (
+            'post', f'/api/recipes/{favorite.recipe_id}/favorite/', {}
+        ),
+        'recipes_shopping_cart_delete': (
+            'delete', f'/api/recipes/{cart.recipe_id}/shopping_cart/', {}
+        ),
+        'recipes_shopping_cart': (
+            'post', f'/api/recipes/{cart.recipe_id}/shopping_cart/', {}
+        ),
+        'recipes_download_pdf': (
+            'get', '/api/recipes/download_shopping_cart/', {}
+        ),
+        'recipes_download_csv': (
+            'get', '/api/recipes/download_shopping_cart/', {'format': 'csv'}
+        ),
+    }, headers
+
+
+@pytest.mark.parametrize(
+    'names', ENDPOINTS, ids=lambda names: '+'.join(names)
+)
+def test_endpoint(size, endpoints, names, run_benchmark):
+    endpoints, headers = endpoints
+    client = Client()
+    run_benchmark(size, {
+        name: (
+            lambda name=name: request(client, *endpoints[name], headers)
+        )
+        for name in names
+    })
@@ -0,0 +1,71 @@
+"""
+Поиск ингредиентов по началу названия (автодополнение в редакторе
+рецепта): индекс в памяти (core.ingredient_index) против прежнего
+SearchFilter с '^name', который выполнял LIKE 'x%' на каждый запрос.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.filters import SearchFilter
+from rest_framework.test import APIRequestFactory
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from core.ingredient_index import ingredient_index
+from foodgram.models import Ingredient
+from foodgram.serializers import IngredientSerializer
+from foodgram.views import IngredientViewSet
+
+# Одна буква - сотни совпадений, три - десятки, слово - единицы.
+PREFIXES = ('к', 'пер', 'молоко')
+
+
+class IngredientNameFilter(SearchFilter):
+    search_param = 'name'
+
+
+class SearchFilterIngredientViewSet(ReadOnlyModelViewSet):
+    """
+    Поиск ингредиентов до индекса в памяти, для сравнения.
+    """
+    queryset = Ingredient.objects.all()
+    serializer_class = IngredientSerializer
+    filter_backends = (IngredientNameFilter,)
+    search_fields = ('^name',)
+
+
+@pytest.fixture(scope='module')
+def catalogue(django_db_setup, django_db_blocker):
+    """
+    Справочник ингредиентов из data/ingredients.json. Удаляются
+    только ингредиенты, которых не было в базе до бенчмарка.
+    """
+    with django_db_blocker.unblock():
+        existing = set(Ingredient.objects.values_list('pk', flat=True))
+        call_command('load_ingredients', stdout=StringIO())
+        yield
+        Ingredient.objects.exclude(pk__in=existing).delete()
+
+
+@pytest.mark.parametrize('prefix', PREFIXES)
+def test_ingredient_search(catalogue, benchmark_db, prefix, run_benchmark):
+    factory = APIRequestFactory()
+    index_view = IngredientViewSet.as_view({'get': 'list'})
+    filter_view = SearchFilterIngredientViewSet.as_view({'get': 'list'})
+    ingredient_index.warm_up()
+    results = run_benchmark('ingredient_search', {
+        f'index_{prefix}': lambda: index_view(
+            factory.get('/api/ingredients/', {'name': prefix})
+        ).render(),
+        f'index_limit_10_{prefix}': lambda: index_view(
+            factory.get('/api/ingredients/', {'name': prefix, 'limit': 10})
+        ).render(),
+        f'search_filter_{prefix}': lambda: filter_view(
+            factory.get('/api/ingredients/', {'name': prefix})
+        ).render(),
+    })
+    index, search_filter = (
+        results[f'index_{prefix}'], results[f'search_filter_{prefix}']
+    )
+    assert index['queries'] == 0
+    assert index['time_ms'] < search_filter['time_ms']
@@ -0,0 +1,69 @@
+"""
+Полнотекстовый поиск рецептов (параметр 'search') на данных seed_scale.
+По миллиону рецептов: pytest backend/benchmarks/test_recipe_search.py
+--benchmark-sizes xlarge на PostgreSQL. Там же EXPLAIN ANALYZE
+проверяет, что выборочные запросы идут через индекс GIN. Частое
+слово в эту проверку не входит: совпадения ранжируются все, и план
+с перебором таблицы для него допустим.
+"""
+import pytest
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+
+from benchmarks.measure import request
+from core.filters import RecipeFilter
+from foodgram.models import Recipe, RecipeIngredient
+
+SEARCH_INDEX = 'recipe_search_vector_idx'
+
+
+@pytest.fixture
+def search_words(seeded_db):
+    """
+    Слова для поиска: из названия самого частого и самого редкого
+    ингредиента рецептов, оба вместе и слово без совпадений.
+    :return: dict: Название замера -> строка поиска.
+    """
+    usage = RecipeIngredient.objects.values(
+        'ingredient__name'
+    ).annotate(recipes=Count('recipe')).order_by('-recipes', 'ingredient')
+    common = usage.first()['ingredient__name'].split()[0]
+    rare = usage.last()['ingredient__name'].split()[0]
+    return {
+        'recipes_search_common': common,
+        'recipes_search_rare': rare,
+        'recipes_search_both': f'{common} {rare}',
+        'recipes_search_missing': 'несуществующийрецепт',
+    }
+
+
+def test_recipe_search(size, search_words, run_benchmark):
+    client = Client()
+    run_benchmark(size, {
+        name: (
+            lambda words=words: request(
+                client, 'get', '/api/recipes/',
+                {'search': words, 'limit': 6},
+            )
+        )
+        for name, words in search_words.items()
+    })
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='индекс GIN есть в PostgreSQL'
+)
+@pytest.mark.parametrize('name', (
+    'recipes_search_rare', 'recipes_search_both', 'recipes_search_missing',
+))
+def test_recipe_search_uses_gin_index(search_words, name):
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE foodgram_recipe')
+    queryset = RecipeFilter(
+        {'search': search_words[name]}, queryset=Recipe.objects.all()
+    ).qs[:7]
+    plan = queryset.explain(analyze=True)
+    message = f'{name}:\n{plan}'
+    assert SEARCH_INDEX in plan, message
+    assert 'Seq Scan on foodgram_recipe' not in plan, message
@@ -0,0 +1,89 @@
+"""
+Создание и изменение рецепта в зависимости от количества ингредиентов:
+ингредиенты проверяются одним запросом, при изменении пишутся только
+отличающиеся строки.
+"""
+import pytest
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from foodgram.models import Ingredient, Recipe, Tag
+from users.models import CustomUser
+
+INGREDIENT_COUNTS = (1, 10, 30, 100)
+
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJ'
+    'AAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+)
+
+
+@pytest.fixture(scope='module')
+def recipe_data(django_db_setup, django_db_blocker):
+    """
+    Автор, тег и ингредиенты для рецептов бенчмарка.
+    :return: tuple: (заголовки авторизации, id тега, id ингредиентов).
+    """
+    with django_db_blocker.unblock():
+        author = CustomUser.objects.create_user(
+            username='write-benchmark', email='write-benchmark@example.com',
+            password='write-benchmark', first_name='Write',
+            last_name='Benchmark',
+        )
+        tag = Tag.objects.create(
+            name='Бенчмарк записи', color='#123456', slug='write-benchmark'
+        )
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Бенчмарк записи {i:03d}', measurement_unit='г')
+            for i in range(max(INGREDIENT_COUNTS))
+        )
+        token = Token.objects.create(user=author)
+        yield (
+            {'HTTP_AUTHORIZATION': f'Token {token.key}'},
+            tag.pk,
+            [ingredient.pk for ingredient in ingredients],
+        )
+        Recipe.objects.filter(author=author).delete()
+        author.delete()
+        tag.delete()
+        Ingredient.objects.filter(
+            pk__in=[ingredient.pk for ingredient in ingredients]
+        ).delete()
+
+
+@pytest.mark.parametrize('count', INGREDIENT_COUNTS)
+def test_recipe_write(recipe_data, benchmark_db, settings, tmp_path, count,
+                      run_benchmark):
+    settings.MEDIA_ROOT = tmp_path
+    headers, tag, ingredient_ids = recipe_data
+    ingredients = [
+        {'id': pk, 'amount': 10} for pk in ingredient_ids[:count]
+    ]
+    client = Client()
+    created = []
+
+    def create():
+        response = client.post('/api/recipes/', {
+            'name': f'Рецепт {count} {len(created)}',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE,
+            'tags': [tag],
+            'ingredients': ingredients,
+        }, content_type='application/json', **headers)
+        created.append(response.json().get('id'))
+        return response
+
+    def update():
+        # Меняется количество одного ингредиента: одна строка
+        # в bulk_update, без удаления и вставки остальных.
+        ingredients[0]['amount'] += 1
+        return client.patch(
+            f'/api/recipes/{created[0]}/', {'ingredients': ingredients},
+            content_type='application/json', **headers,
+        )
+
+    run_benchmark('recipe_write', {
+        f'create_{count}': create,
+        f'update_one_amount_{count}': update,
+    })
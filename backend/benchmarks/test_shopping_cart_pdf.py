@@ -0,0 +1,52 @@
+"""
+Выгрузка списка покупок в PDF для списков из 10, 200 и 2000 строк:
+шрифт регистрируется один раз, страницы добавляются по мере заполнения,
+файл отдается частями.
+"""
+import pytest
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from benchmarks.measure import request
+from foodgram.models import Ingredient, ShoppingCartIngredient
+from users.models import CustomUser
+
+LINES = (10, 200, 2000)
+
+
+@pytest.fixture(params=LINES, ids=lambda lines: f'lines_{lines}')
+def shopping_list(request, benchmark_db):
+    """
+    Пользователь со списком покупок из 'lines' строк.
+    :return: tuple: (количество строк, заголовки авторизации).
+    """
+    lines = request.param
+    user = CustomUser.objects.create_user(
+        username='pdf-benchmark', email='pdf-benchmark@example.com',
+        password='pdf-benchmark', first_name='PDF', last_name='Benchmark',
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(name=f'PDF бенчмарк {i:05d}', measurement_unit='г')
+        for i in range(lines)
+    )
+    ShoppingCartIngredient.objects.bulk_create(
+        ShoppingCartIngredient(user=user, ingredient=ingredient, amount=i)
+        for i, ingredient in enumerate(ingredients, start=1)
+    )
+    token = Token.objects.create(user=user)
+    yield lines, {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+    user.delete()
+    Ingredient.objects.filter(
+        pk__in=[ingredient.pk for ingredient in ingredients]
+    ).delete()
+
+
+def test_shopping_cart_pdf(shopping_list, run_benchmark):
+    lines, headers = shopping_list
+    client = Client()
+    run_benchmark('shopping_cart_pdf', {
+        f'lines_{lines}': lambda: request(
+            client, 'get', '/api/recipes/download_shopping_cart/',
+            headers=headers,
+        ),
+    })
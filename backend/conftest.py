@@ -0,0 +1,117 @@
+import pytest
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from core.recipe_cache import recipe_body_cache
+from core.token_cache import token_cache
+from foodgram.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import CustomUser
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Очищает кэши Django и кэши в памяти процесса перед каждым тестом.
+    """
+    for cache in caches.all():
+        cache.clear()
+    recipe_body_cache.clear()
+    token_cache.clear()
+
+
+def create_user(name, **kwargs):
+    return CustomUser.objects.create_user(
+        username=name,
+        email=f'{name}@example.com',
+        password='password-123',
+        first_name=name,
+        last_name=name,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def make_user(db):
+    return create_user
+
+
+@pytest.fixture
+def user(db):
+    return create_user('user')
+
+
+@pytest.fixture
+def author(db):
+    return create_user('author')
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def staff_client(db, client):
+    """
+    Клиент Django с сессией суперпользователя для запросов к админке.
+    """
+    client.force_login(
+        create_user('admin', is_staff=True, is_superuser=True)
+    )
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return Tag.objects.bulk_create(
+        Tag(name=f'Тег {i}', color=f'#0000{i:02d}', slug=f'tag-{i}')
+        for i in range(3)
+    )
+
+
+@pytest.fixture
+def ingredients(db):
+    return Ingredient.objects.bulk_create(
+        Ingredient(name=f'Ингредиент {i:03d}', measurement_unit='г')
+        for i in range(50)
+    )
+
+
+@pytest.fixture
+def make_recipes(author, tags, ingredients):
+    """
+    Создает рецепты автора через ORM.
+    :return: Функция (count, ingredients_count=3, **fields) -> list.
+    """
+    created = []
+
+    def make(count, ingredients_count=3, **fields):
+        recipes = []
+        for _ in range(count):
+            recipe = Recipe.objects.create(
+                author=fields.get('author', author),
+                name=f'Рецепт {len(created)}',
+                image='recipes/images/recipe.png',
+                text='Описание',
+                cooking_time=fields.get('cooking_time', 5),
+            )
+            recipe.tags.set(fields.get('tags', tags[:2]))
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                 amount=10 + i)
+                for i, ingredient in enumerate(
+                    ingredients[:ingredients_count]
+                )
+            )
+            created.append(recipe)
+            recipes.append(recipe)
+        return recipes
+
+    return make
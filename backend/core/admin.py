@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from core.pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Общие настройки списков админки для больших таблиц:
+    без отдельного подсчета всех строк и с оценкой количества строк
+    для списка без фильтров.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,185 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.authentication import CachedTokenAuthentication
+from core.catalogue import aget_catalogue_version, get_catalogue_etag
+
+STREAM_BATCH_SIZE = 500
+
+
+async def iterate_in_thread(iterator, batch_size=STREAM_BATCH_SIZE):
+    """
+    Отдает элементы синхронного итератора в асинхронный ответ.
+    Итератор (и запросы к базе в нем) продолжается в потоке
+    синхронного кода по batch_size элементов за раз, поэтому
+    в памяти не больше одной пачки.
+    :param iterator: Синхронный итератор, например строки выгрузки.
+    :return: AsyncGenerator элементов iterator.
+    """
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+    while batch := await next_batch():
+        for item in batch:
+            yield item
+
+
+class AsyncAPIView(View):
+    """
+    Асинхронное представление для чтения под ASGI.
+    GET обрабатывается в цикле событий: токен, страница и объекты
+    запрашиваются через асинхронный ORM. Синхронные части
+    (фильтры, кэш, сериализаторы) выполняются в пуле потоков.
+    Остальные методы передаются синхронному представлению DRF
+    'sync_view', поэтому запись и права работают как раньше.
+    - `action` - метод, обрабатывающий GET: 'list' или 'retrieve'.
+    - `login_required` - GET только для авторизованных пользователей.
+    """
+    action = None
+    sync_view = None
+    queryset = None
+    serializer_class = None
+    pagination_class = None
+    filter_backends = ()
+    login_required = False
+    authentication_class = CachedTokenAuthentication
+    renderer_class = api_settings.DEFAULT_RENDERER_CLASSES[0]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            if self.sync_view is None:
+                return self.handle_exception(
+                    exceptions.MethodNotAllowed(request.method)
+                )
+            return await sync_to_async(self.sync_view)(
+                request, *args, **kwargs
+            )
+        self.request = Request(request)
+        try:
+            await self.perform_authentication()
+            return await self.get(self.request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            return self.handle_exception(exc)
+
+    async def get(self, request, *args, **kwargs):
+        return await getattr(self, self.action)(request, *args, **kwargs)
+
+    async def perform_authentication(self):
+        result = await self.authentication_class().aauthenticate(
+            self.request
+        )
+        self.request.user, self.request.auth = result or (
+            AnonymousUser(), None
+        )
+        if self.login_required and not self.request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    def handle_exception(self, exc):
+        """
+        Отвечает на ошибку так же, как обработчик ошибок DRF.
+        """
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound()
+        response = self.render(
+            exc.detail if isinstance(exc.detail, (list, dict))
+            else {'detail': exc.detail},
+            status=exc.status_code,
+        )
+        if isinstance(exc, (exceptions.NotAuthenticated,
+                            exceptions.AuthenticationFailed)):
+            response['WWW-Authenticate'] = (
+                self.authentication_class().authenticate_header(self.request)
+            )
+        return response
+
+    def render(self, data, status=200):
+        renderer = self.renderer_class()
+        return HttpResponse(
+            renderer.render(data),
+            status=status,
+            content_type=renderer.media_type,
+        )
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+
+    async def filter_queryset(self, queryset):
+        """
+        Применяет 'filter_backends' в потоке: фильтры проверяют
+        параметры запросами к базе (например, slug тегов).
+        """
+        def apply_filters():
+            result = queryset
+            for backend in self.filter_backends:
+                result = backend().filter_queryset(self.request, result, self)
+            return result
+        return await sync_to_async(apply_filters)()
+
+    async def serialize(self, instance, many=False):
+        """
+        Сериализует объекты в потоке: сериализаторы используют кэш
+        и синхронный код DRF.
+        """
+        serializer = self.serializer_class(
+            instance, many=many, context=self.get_serializer_context()
+        )
+        return await sync_to_async(lambda: serializer.data)()
+
+    async def list(self, request, *args, **kwargs):
+        queryset = await self.filter_queryset(self.get_queryset())
+        if self.pagination_class is not None:
+            paginator = self.pagination_class()
+            page = await paginator.apaginate_queryset(queryset, request, self)
+            if page is not None:
+                return self.render(paginator.get_paginated_response(
+                    await self.serialize(page, many=True)
+                ).data)
+        return self.render(await self.serialize(
+            [obj async for obj in queryset], many=True
+        ))
+
+    async def retrieve(self, request, pk, *args, **kwargs):
+        queryset = self.get_queryset()
+        try:
+            instance = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise Http404
+        return self.render(await self.serialize(instance))
+
+
+class AsyncCatalogueView(AsyncAPIView):
+    """
+    Асинхронный вариант CatalogueConditionalMixin:
+    список справочника с заголовком ETag
+    и ответом 304, если справочник не менялся.
+    Сам список формирует метод 'catalogue_list'.
+    """
+
+    async def list(self, request, *args, **kwargs):
+        version = await aget_catalogue_version(self.queryset.model)
+        etag = get_catalogue_etag(
+            version, request.get_full_path(), self.renderer_class.media_type
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await self.catalogue_list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    async def catalogue_list(self, request, *args, **kwargs):
+        return await super().list(request, *args, **kwargs)
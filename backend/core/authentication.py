@@ -0,0 +1,89 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (TokenAuthentication,
+                                           get_authorization_header)
+
+from core.token_cache import token_cache
+
+
+class AsyncTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, который умеет проверять токен
+    через асинхронный ORM для асинхронных представлений.
+    """
+
+    def get_key(self, request):
+        """
+        Достает токен из заголовка 'Authorization: Token <key>'.
+        :param request: HTTP request object.
+        :return: str: Токен или None, если заголовка нет.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. No credentials provided.')
+            )
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. '
+                  'Token string should not contain spaces.')
+            )
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. '
+                  'Token string should not contain invalid characters.')
+            )
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        return self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        """
+        Асинхронный вариант 'authenticate'.
+        """
+        key = self.get_key(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return token.user, token
+
+
+class CachedTokenAuthentication(AsyncTokenAuthentication):
+    """
+    Токен-аутентификация с кэшем токенов (core.token_cache).
+    Запрос Token + CustomUser выполняется только при промахе кэша.
+    Записи удаляются сигналами при выходе, смене пароля
+    и отключении пользователя (users/signals.py).
+    """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(token)
+        return token.user, token
+
+    async def aauthenticate_credentials(self, key):
+        token = await token_cache.aget(key)
+        if token is None:
+            user, token = await super().aauthenticate_credentials(key)
+            await token_cache.aset(token)
+        return token.user, token
@@ -0,0 +1,53 @@
+from hashlib import md5
+from time import time
+
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+CATALOGUE_VERSION_KEY = 'catalogue_version:{}'
+
+
+def get_catalogue_version(model):
+    """
+    Возвращает версию справочника (теги, ингредиенты).
+    Версия - время последнего изменения справочника, хранится в кэше.
+    Если версии в кэше нет, справочник считается измененным сейчас.
+    :param model: Модель справочника.
+    :return: float: Версия справочника.
+    """
+    return cache.get_or_set(
+        CATALOGUE_VERSION_KEY.format(model._meta.label_lower), time, None
+    )
+
+
+async def aget_catalogue_version(model):
+    """
+    Асинхронный вариант 'get_catalogue_version'.
+    """
+    return await cache.aget_or_set(
+        CATALOGUE_VERSION_KEY.format(model._meta.label_lower), time, None
+    )
+
+
+def get_catalogue_etag(version, path, media_type):
+    """
+    Возвращает ETag списка справочника.
+    :param version: Версия справочника.
+    :param path: str: Путь запроса с параметрами.
+    :param media_type: str: Формат ответа.
+    :return: str: ETag в кавычках.
+    """
+    return quote_etag(md5(
+        f'{version}:{path}:{media_type}'.encode()
+    ).hexdigest())
+
+
+def bump_catalogue_version(model):
+    """
+    Обновляет версию справочника после изменения его записей.
+    :param model: Модель справочника.
+    :return: None
+    """
+    cache.set(
+        CATALOGUE_VERSION_KEY.format(model._meta.label_lower), time(), None
+    )
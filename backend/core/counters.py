@@ -0,0 +1,73 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from foodgram.models import Cart, Favorite, Recipe
+from users.models import CustomUser
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_cart_count', Cart, 'recipe'),
+    (CustomUser, 'recipes_count', Recipe, 'author'),
+)
+
+
+def count_related(model, field):
+    """
+    Подзапрос с количеством объектов model, ссылающихся на строку.
+    :param model: Модель связанных объектов.
+    :param field: Название внешнего ключа в model.
+    :return: Выражение для annotate() и update().
+    """
+    return Coalesce(Subquery(
+        model.objects.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def change_counter(model, pk, counter, delta):
+    """
+    Изменяет счетчик строки выражением F(), без чтения значения.
+    Вызывается сигналами (foodgram/signals.py) в той же транзакции,
+    что и изменение связанных объектов.
+    :param model: Модель со счетчиком.
+    :param pk: pk строки.
+    :param counter: Название поля счетчика.
+    :param delta: Изменение счетчика.
+    :return: None
+    """
+    if delta:
+        model.objects.filter(pk=pk).update(**{counter: F(counter) + delta})
+
+
+def change_counters(model, pks, counter, delta):
+    """
+    Изменяет счетчик нескольких строк одним запросом UPDATE.
+    :param model: Модель со счетчиком.
+    :param pks: pk строк.
+    :param counter: Название поля счетчика.
+    :param delta: Изменение счетчика каждой строки.
+    :return: None
+    """
+    if delta and pks:
+        model.objects.filter(
+            pk__in=pks
+        ).update(**{counter: F(counter) + delta})
+
+
+def recount():
+    """
+    Пересчитывает счетчики, которые разошлись с реальными данными.
+    :return: dict: Количество исправленных строк для каждого счетчика.
+    """
+    repaired = {}
+    for model, counter, related_model, field in COUNTERS:
+        actual = count_related(related_model, field)
+        drifted = model.objects.annotate(
+            actual=actual
+        ).exclude(**{counter: F('actual')}).values('pk')
+        repaired[f'{model.__name__}.{counter}'] = model.objects.filter(
+            pk__in=drifted
+        ).update(**{counter: actual})
+    return repaired
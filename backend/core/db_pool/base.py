@@ -0,0 +1,90 @@
+from threading import Lock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import (IsolationLevel,
+                                                       is_psycopg3)
+from django.utils.asyncio import async_unsafe
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
+
+POOL_DEFAULTS = {
+    'min_size': 2,
+    'max_size': 10,
+    'timeout': 10,
+    'max_idle': 300,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL с пулом соединений psycopg_pool внутри процесса.
+    Настройки пула передаются в OPTIONS['pool'] (min_size, max_size,
+    timeout, max_idle), как в Django 5.1.
+    Соединение берется из пула при первом запросе к базе и возвращается
+    в пул при закрытии (в конце HTTP запроса при CONN_MAX_AGE = 0),
+    поэтому воркер не тратит время на TLS и авторизацию.
+    Пулы создаются лениво, после fork, отдельно для каждой базы.
+    """
+    _pools = {}
+    _pools_lock = Lock()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        """
+        Возвращает пул для текущей базы, создавая его при первом вызове.
+        :param conn_params: dict: Параметры соединения psycopg.
+        :return: ConnectionPool.
+        """
+        if not is_psycopg3 or ConnectionPool is None:
+            raise ImproperlyConfigured(
+                'Для пула соединений нужны psycopg 3 и psycopg_pool: '
+                'pip install "psycopg[binary,pool]".'
+            )
+        key = (self.alias, conn_params.get('dbname'))
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    kwargs=conn_params,
+                    name=f'foodgram-{self.alias}',
+                    check=ConnectionPool.check_connection,
+                    open=True,
+                    **{
+                        **POOL_DEFAULTS,
+                        **self.settings_dict['OPTIONS'].get('pool', {}),
+                    },
+                )
+                self._pools[key] = pool
+        return pool
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        # Соединения пула общие, поэтому уровень изоляции не меняется
+        # через OPTIONS и остается уровнем PostgreSQL по умолчанию.
+        self.isolation_level = IsolationLevel.READ_COMMITTED
+        self.pool = self.get_pool(conn_params)
+        return self.pool.getconn()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+
+    @classmethod
+    def close_pools(cls):
+        """
+        Закрывает все пулы процесса, например при остановке воркера.
+        :return: None
+        """
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.close()
+            cls._pools.clear()
@@ -1,10 +1,79 @@
-from foodgram.models import Ingredient
-from rest_framework.filters import SearchFilter
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import (Case, Exists, F, IntegerField, OuterRef, Q,
+                              Value, When)
+from django_filters import rest_framework as filters
+from foodgram.models import Recipe
 
 
-class IngredientNameFilter(SearchFilter):
-    search_param = 'name'
+class RecipeFilter(filters.FilterSet):
+    """
+    Фильтрация рецептов. Все параметры можно комбинировать.
+    Флаги пользователя и теги проверяются подзапросами EXISTS,
+    поэтому рецепты в выдаче не дублируются и DISTINCT не нужен.
+    Параметр 'search' ищет по названию и описанию и сортирует
+    результат по релевантности.
+    Queryset должен быть аннотирован Recipe.objects.with_user_flags().
+    """
+    is_favorited = filters.NumberFilter(method='filter_user_flag')
+    is_in_shopping_cart = filters.NumberFilter(method='filter_user_flag')
+    tags = filters.CharFilter(method='filter_tags')
+    author = filters.NumberFilter(field_name='author')
+    cooking_time = filters.RangeFilter()
+    search = filters.CharFilter(method='filter_search')
+
+    search_config = 'russian'
 
     class Meta:
-        model = Ingredient
-        fields = ('name',)
+        model = Recipe
+        fields = (
+            'is_favorited', 'is_in_shopping_cart', 'tags',
+            'author', 'cooking_time', 'search',
+        )
+
+    def filter_user_flag(self, queryset, name, value):
+        """
+        Оставляет рецепты, у которых флаг пользователя 'name'
+        равен значению параметра (1 или 0).
+        """
+        return queryset.filter(**{name: bool(value)})
+
+    def filter_tags(self, queryset, name, value):
+        """
+        Оставляет рецепты, у которых есть хотя бы один из тегов.
+        Параметр повторяется для каждого слага (tags=a&tags=b).
+        Неизвестные слаги не считаются ошибкой: клиенты могут
+        присылать слаги удаленных тегов.
+        """
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag__slug__in=self.data.getlist(name),
+        )))
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию и описанию рецепта.
+        На PostgreSQL используется поле 'search_vector' с индексом GIN,
+        совпадения в названии весят больше, чем в описании.
+        На других базах каждое слово ищется через LIKE, выше
+        поднимаются рецепты, в названии которых есть вся строка.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+        if connection.vendor == 'postgresql':
+            query = SearchQuery(
+                value, config=self.search_config, search_type='websearch',
+            )
+            return queryset.filter(search_vector=query).annotate(
+                rank=SearchRank(F('search_vector'), query),
+            ).order_by('-rank', '-created', '-id')
+        condition = Q()
+        for word in value.split():
+            condition &= Q(name__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition).annotate(
+            rank=Case(
+                When(name__icontains=value, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        ).order_by('-rank', '-created', '-id')
@@ -0,0 +1,66 @@
+from bisect import bisect_left
+from threading import Lock
+
+from core.catalogue import get_catalogue_version
+from foodgram.models import Ingredient
+
+
+class IngredientIndex:
+    """
+    Отсортированный по названию список ингредиентов в памяти процесса.
+    Отвечает на поиск по началу названия без запросов к базе.
+    Индекс перестраивается при первом обращении после изменения
+    версии справочника ингредиентов.
+    """
+
+    def __init__(self):
+        self._keys = None
+        self._items = None
+        self._version = None
+        self._lock = Lock()
+
+    def _build(self, version):
+        ingredients = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda item: (item['name'].lower(), item['id']),
+        )
+        self._keys = [item['name'].lower() for item in ingredients]
+        self._items = ingredients
+        self._version = version
+
+    def _ensure_built(self):
+        version = get_catalogue_version(Ingredient)
+        if self._items is not None and self._version == version:
+            return
+        with self._lock:
+            if self._items is None or self._version != version:
+                self._build(version)
+
+    def warm_up(self):
+        """
+        Строит индекс заранее, чтобы первый поиск не ждал загрузки.
+        :return: None
+        """
+        self._ensure_built()
+
+    def search(self, prefix, limit=None):
+        """
+        Возвращает ингредиенты, название которых начинается с prefix.
+        :param prefix: str: Начало названия, регистр не учитывается.
+        :param limit: int: Максимальное количество результатов.
+        :return: list: Словари с ключами 'id', 'name', 'measurement_unit'.
+        """
+        self._ensure_built()
+        keys, items = self._keys, self._items
+        prefix = prefix.lower()
+        start = bisect_left(keys, prefix)
+        stop = len(keys) if limit is None else min(start + limit, len(keys))
+        result = []
+        for position in range(start, stop):
+            if not keys[position].startswith(prefix):
+                break
+            result.append(items[position])
+        return result
+
+
+ingredient_index = IngredientIndex()
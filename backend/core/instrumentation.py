@@ -0,0 +1,212 @@
+import logging
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+
+logger = logging.getLogger('foodgram.db')
+
+# Границы корзин гистограммы времени ответа, в секундах.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+current_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Время фаз одного запроса в секундах.
+    - `db` и `queries` - время и количество запросов к базе.
+    - `view` - время представления без запросов к базе:
+        сериализаторы и код представления.
+    - `render` - отрисовка ответа DRF (JSON и другие форматы).
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.view_started = None
+        self.view_db = 0.0
+        self.view = 0.0
+        self.render_started = None
+        self.render = 0.0
+
+    def start_view(self):
+        self.view_started = perf_counter()
+        self.view_db = self.db
+
+    def finish_view(self):
+        if self.view_started is not None:
+            self.view = max(
+                perf_counter() - self.view_started
+                - (self.db - self.view_db), 0.0
+            )
+
+    def start_render(self):
+        self.finish_view()
+        self.render_started = perf_counter()
+
+    def finish_render(self):
+        if self.render_started is not None:
+            self.render = perf_counter() - self.render_started
+
+    @property
+    def total(self):
+        return perf_counter() - self.started
+
+    def server_timing(self, total):
+        """
+        Значение заголовка Server-Timing, длительности в миллисекундах.
+        """
+        return ', '.join((
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+            f'serialize;dur={self.view * 1000:.1f};desc="view"',
+            f'render;dur={self.render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+
+
+def time_queries(execute, sql, params, many, context):
+    """
+    Обертка выполнения запросов (connection.execute_wrapper).
+    Добавляет время запроса к текущему запросу HTTP и пишет
+    в лог запросы дольше settings.SLOW_QUERY_MS. Параметры в лог
+    не попадают: среди них ключи токенов и хэши паролей.
+    """
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        timings = current_timings.get()
+        if timings is not None:
+            timings.db += duration
+            timings.queries += 1
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                'Медленный запрос %.1f мс: %s',
+                duration * 1000, sql,
+            )
+
+
+def install_query_timer(connection):
+    """
+    Подключает time_queries к соединению с базой.
+    Подключение к каждому соединению, а не на время запроса,
+    учитывает и запросы из потоков асинхронных представлений.
+    """
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+class RouteMetrics:
+    """
+    Метрики запросов по маршрутам в памяти процесса:
+    гистограмма времени ответа, время и количество запросов к базе.
+    Каждый воркер отдает свои метрики, Prometheus суммирует их
+    по меткам экземпляра.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._routes = {}
+        self._lock = Lock()
+
+    def observe(self, route, method, timings, total):
+        with self._lock:
+            metric = self._routes.setdefault((route, method), {
+                'buckets': [0] * (len(self.buckets) + 1),
+                'sum': 0.0,
+                'count': 0,
+                'db_sum': 0.0,
+                'queries': 0,
+            })
+            metric['buckets'][bisect_left(self.buckets, total)] += 1
+            metric['sum'] += total
+            metric['count'] += 1
+            metric['db_sum'] += timings.db
+            metric['queries'] += timings.queries
+
+    def render(self):
+        """
+        Метрики в текстовом формате Prometheus.
+        :return: str.
+        """
+        with self._lock:
+            routes = {
+                key: {**value, 'buckets': list(value['buckets'])}
+                for key, value in sorted(self._routes.items())
+            }
+        lines = [
+            '# HELP foodgram_request_duration_seconds '
+            'Время ответа по маршрутам.',
+            '# TYPE foodgram_request_duration_seconds histogram',
+        ]
+        for (route, method), metric in routes.items():
+            labels = f'route="{escape(route)}",method="{method}"'
+            cumulative = 0
+            bounds = [f'{bound:g}' for bound in self.buckets] + ['+Inf']
+            for bound, count in zip(bounds, metric['buckets']):
+                cumulative += count
+                lines.append(
+                    f'foodgram_request_duration_seconds_bucket'
+                    f'{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'foodgram_request_duration_seconds_sum{{{labels}}} '
+                f'{metric["sum"]:.6f}'
+            )
+            lines.append(
+                f'foodgram_request_duration_seconds_count{{{labels}}} '
+                f'{metric["count"]}'
+            )
+        for name, key, kind, help_text, fmt in (
+            ('foodgram_db_duration_seconds_total', 'db_sum', 'counter',
+             'Время запросов к базе по маршрутам.', '{:.6f}'),
+            ('foodgram_db_queries_total', 'queries', 'counter',
+             'Количество запросов к базе по маршрутам.', '{}'),
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(
+                f'{name}{{route="{escape(route)}",method="{method}"}} '
+                + fmt.format(metric[key])
+                for (route, method), metric in routes.items()
+            )
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n')
+
+
+def render_cache_metrics(caches):
+    """
+    Счетчики попаданий кэшей в текстовом формате Prometheus.
+    :param caches: dict: Название кэша и объект с методом stats().
+    :return: str.
+    """
+    lines = [
+        '# HELP foodgram_cache_requests_total Обращения к кэшам процесса.',
+        '# TYPE foodgram_cache_requests_total counter',
+    ]
+    for name, cache in caches.items():
+        for result, value in cache.stats().items():
+            if result != 'hit_rate':
+                lines.append(
+                    f'foodgram_cache_requests_total'
+                    f'{{cache="{name}",result="{result}"}} {value}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+route_metrics = RouteMetrics()
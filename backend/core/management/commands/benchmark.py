@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.measure import BUDGETS_PATH, SIZES
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает бенчмарки pytest из backend/benchmarks: эндпоинты API '
+        'на синтетических данных (seed_scale) нескольких размеров во '
+        'временной тестовой базе. Замеряет время, количество запросов '
+        'к базе, полученные строки и пиковую память, сравнивает их '
+        'с бюджетами для текущей базы данных (SQLite, PostgreSQL) '
+        'и пишет JSON отчет. Нужны пакеты из requirements-dev.txt.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='small,medium',
+            help=f'Размеры данных через запятую: {", ".join(SIZES)}.',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--budgets', default=BUDGETS_PATH)
+        parser.add_argument('--report', default='benchmark_report.json')
+        parser.add_argument(
+            '--update-budgets', action='store_true',
+            help='Записать бюджеты по текущим результатам.',
+        )
+        parser.add_argument(
+            'pytest_args', nargs='*',
+            help='Дополнительные аргументы pytest, например -k recipes.',
+        )
+
+    def handle(self, *args, **options):
+        command = [
+            sys.executable, '-m', 'pytest', 'benchmarks',
+            f'--benchmark-sizes={options["sizes"]}',
+            f'--benchmark-repeat={options["repeat"]}',
+            f'--benchmark-seed={options["seed"]}',
+            f'--benchmark-budgets={os.path.abspath(options["budgets"])}',
+            f'--benchmark-report={os.path.abspath(options["report"])}',
+            *options['pytest_args'],
+        ]
+        if options['update_budgets']:
+            command.append('--update-budgets')
+        # pytest запускается отдельным процессом: настройки Django
+        # в нем - тестовые (setup.cfg), а не настройки этой команды.
+        env = {
+            key: value for key, value in os.environ.items()
+            if key != 'DJANGO_SETTINGS_MODULE'
+        }
+        code = subprocess.run(command, cwd=settings.BASE_DIR, env=env)
+        if code.returncode:
+            raise CommandError(
+                f'Бенчмарки не прошли (код pytest {code.returncode}).'
+            )
+        self.stdout.write(f'Отчет: {options["report"]}')
@@ -0,0 +1,76 @@
+from statistics import mean, median, quantiles
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет накладные расходы на соединение с базой: время '
+        'первого запроса (SELECT 1) в цикле HTTP запроса без '
+        'переиспользования соединений (CONN_MAX_AGE=0) и с текущими '
+        'настройками (CONN_MAX_AGE, CONN_HEALTH_CHECKS, DB_POOL). '
+        'Начало и конец запроса имитируются сигналами request_started '
+        'и request_finished, как в обработчике Django.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Количество имитируемых HTTP запросов в каждом режиме.',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        configured = settings_dict['CONN_MAX_AGE']
+        engine = settings_dict['ENGINE'].rsplit('.', 1)[-1]
+        modes = (
+            ('без переиспользования (CONN_MAX_AGE=0)', 0),
+            (f'текущие настройки ({engine}, CONN_MAX_AGE={configured}, '
+             f'CONN_HEALTH_CHECKS={settings_dict["CONN_HEALTH_CHECKS"]})',
+             configured),
+        )
+        if engine == 'db_pool':
+            modes = modes[1:]
+        results = []
+        try:
+            for title, max_age in modes:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                connection.close()
+                timings = self.measure(connection, options['requests'])
+                results.append(timings)
+                self.stdout.write(
+                    f'{title}: медиана {median(timings):.2f} мс, '
+                    f'p95 {quantiles(timings, n=20)[-1]:.2f} мс, '
+                    f'среднее {mean(timings):.2f} мс.'
+                )
+        finally:
+            settings_dict['CONN_MAX_AGE'] = configured
+            connection.close()
+        if len(results) == 2:
+            self.stdout.write(self.style.SUCCESS(
+                'Экономия на запрос: '
+                f'{median(results[0]) - median(results[1]):.2f} мс '
+                '(по медиане).'
+            ))
+
+    def measure(self, connection, requests):
+        """
+        :return: list: Время первого запроса к базе в каждом
+            HTTP запросе, мс.
+        """
+        timings = []
+        for _ in range(requests + 1):
+            request_started.send(sender=self.__class__)
+            started = perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            timings.append((perf_counter() - started) * 1000)
+            request_finished.send(sender=self.__class__)
+        # Первый запрос всегда открывает соединение.
+        return timings[1:]
@@ -0,0 +1,62 @@
+from statistics import median
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время отрисовки страницы рецептов (по умолчанию '
+        '100 рецептов) стандартным JSONRenderer и FastJSONRenderer '
+        'и проверяет, что ответы совпадают побайтно. Данные страницы '
+        'берутся из текущей базы, для больших объемов заполните ее '
+        'командой seed_scale.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100,
+                            help='Количество рецептов на странице.')
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                response = Client().get(
+                    '/api/recipes/', {'limit': options['limit']}
+                )
+        finally:
+            teardown_test_environment()
+        if response.status_code != 200:
+            raise CommandError(
+                f'/api/recipes/ ответил {response.status_code}.'
+            )
+        data = response.data
+        self.stdout.write(
+            f'Рецептов на странице: {len(data["results"])}, '
+            f'orjson: {"установлен" if orjson else "не установлен"}.'
+        )
+        results = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            timings = []
+            for _ in range(options['repeat']):
+                started = perf_counter()
+                body = renderer.render(data)
+                timings.append((perf_counter() - started) * 1000)
+            results[type(renderer).__name__] = (median(timings), body)
+            self.stdout.write(
+                f'{type(renderer).__name__}: медиана {median(timings):.3f} '
+                f'мс, {len(body)} байт.'
+            )
+        (slow, expected), (fast, body) = results.values()
+        if body != expected:
+            raise CommandError('Ответы рендереров отличаются.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ответы совпадают, ускорение в {slow / fast:.1f} раза.'
+        ))
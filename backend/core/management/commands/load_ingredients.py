@@ -0,0 +1,207 @@
+import csv
+import json
+import os
+import re
+from itertools import islice
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalogue import bump_catalogue_version
+from foodgram.models import Ingredient
+
+READ_CHUNK_SIZE = 64 * 1024
+# Ошибка разбора ближе к концу буфера может означать, что объект
+# обрезан посередине числа, литерала или \uXXXX: дочитываем файл.
+TRUNCATED_TAIL = 16
+WHITESPACE = re.compile(r'\s*')
+
+
+class JsonArrayReader:
+    """
+    Читает JSON массив объектов частями по READ_CHUNK_SIZE, не загружая
+    файл целиком. buffer - прочитанная часть файла, pos - позиция
+    разбора в ней, offset - позиция начала buffer в файле.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def __iter__(self):
+        if self.next_char() != '[':
+            raise CommandError('Ожидается JSON массив.')
+        self.pos += 1
+        if self.next_char() == ']':
+            return
+        while True:
+            yield self.decode_object()
+            char = self.next_char()
+            if char == ']':
+                return
+            if char != ',':
+                raise CommandError(
+                    f'Ожидается "," или "]", позиция {self.position()}.'
+                )
+            self.pos += 1
+
+    def position(self, pos=None):
+        """
+        :return: int: Позиция в файле (в символах).
+        """
+        return self.offset + (self.pos if pos is None else pos)
+
+    def read_more(self):
+        """
+        Отбрасывает разобранную часть буфера и дочитывает следующую
+        часть файла.
+        :return: bool: False, если файл закончился.
+        """
+        chunk = self.file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        """
+        Пропускает пробелы и возвращает следующий символ.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                raise CommandError('Неожиданный конец JSON файла.')
+
+    def decode_object(self):
+        """
+        Разбирает объект массива, дочитывая файл, пока объект
+        обрезан концом буфера.
+        :return: dict: Объект.
+        """
+        self.next_char()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if self.is_truncated(error) and self.read_more():
+                    continue
+                raise self.decode_error(error)
+            if not isinstance(item, dict):
+                raise CommandError(
+                    f'Ожидается JSON объект, позиция {self.position()}.'
+                )
+            self.pos = end
+            return item
+
+    def is_truncated(self, error):
+        """
+        Ошибку мог вызвать конец буфера: строка не закрыта или ошибка
+        в последних TRUNCATED_TAIL символах. Если файл действительно
+        ошибочен, после дочитывания ошибка повторится не в конце буфера.
+        """
+        return (
+            error.msg.startswith('Unterminated string')
+            or len(self.buffer) - error.pos < TRUNCATED_TAIL
+        )
+
+    def decode_error(self, error):
+        """
+        :return: CommandError: Конец файла внутри объекта
+            или ошибка в файле с ее позицией.
+        """
+        if self.eof and (
+            error.msg.startswith('Unterminated string')
+            or not self.buffer[error.pos:].strip()
+        ):
+            return CommandError('Неожиданный конец JSON файла.')
+        return CommandError(
+            f'Ошибка в JSON файле, позиция {self.position(error.pos)}: '
+            f'{error.msg}.'
+        )
+
+
+def iter_json_array(file):
+    """
+    Построчно читает JSON массив объектов, не загружая файл целиком.
+    :param file: Текстовый файл с JSON массивом.
+    :return: Iterator объектов массива.
+    """
+    return iter(JsonArrayReader(file))
+
+
+def iter_csv_rows(file):
+    """
+    Читает CSV файл со строками 'название,единица измерения'.
+    :param file: Текстовый файл CSV.
+    :return: Generator словарей ингредиентов.
+    """
+    reader = csv.reader(file)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != 2:
+            raise CommandError(
+                f'Строка {reader.line_num}: ожидается '
+                f'"название,единица измерения".'
+            )
+        name, measurement_unit = row
+        yield {'name': name, 'measurement_unit': measurement_unit}
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты из JSON или CSV файла пачками. '
+        'Уже существующие ингредиенты пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=os.path.join(settings.BASE_DIR, 'data/ingredients.json'),
+            help='Путь до файла .json или .csv.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество ингредиентов в одном INSERT.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        readers = {'.json': iter_json_array, '.csv': iter_csv_rows}
+        reader = readers.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise CommandError('Поддерживаются только файлы .json и .csv.')
+        started = perf_counter()
+        before = Ingredient.objects.count()
+        total = 0
+        with open(path, encoding='utf-8', newline='') as file:
+            ingredients = (
+                Ingredient(
+                    name=item['name'],
+                    measurement_unit=item['measurement_unit'],
+                )
+                for item in reader(file)
+            )
+            while batch := list(islice(ingredients, options['batch_size'])):
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                total += len(batch)
+        inserted = Ingredient.objects.count() - before
+        if inserted:
+            bump_catalogue_version(Ingredient)
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено: {inserted}, пропущено: {total - inserted}, '
+            f'время: {perf_counter() - started:.2f} с.'
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.shopping_cart_service import (calculate_ingredients,
+                                        get_ingredients,
+                                        rebuild_shopping_lists)
+from foodgram.models import Cart, ShoppingCartIngredient
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает списки покупок пользователей '
+        'и сверяет их с суммой ингредиентов рецептов в корзине.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сверить списки покупок, не пересобирая их.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            with transaction.atomic():
+                created = rebuild_shopping_lists()
+            self.stdout.write(f'Создано строк списков покупок: {created}')
+        mismatched = []
+        user_ids = set(
+            Cart.objects.values_list('user_id', flat=True)
+        ) | set(
+            ShoppingCartIngredient.objects.values_list('user_id', flat=True)
+        )
+        for user_id in sorted(user_ids):
+            if self.as_set(get_ingredients(user_id)) != self.as_set(
+                    calculate_ingredients(user_id)):
+                mismatched.append(user_id)
+        if mismatched:
+            raise CommandError(
+                'Списки покупок расходятся с корзиной у пользователей: '
+                + ', '.join(map(str, mismatched))
+            )
+        self.stdout.write(self.style.SUCCESS('Списки покупок совпадают.'))
+
+    @staticmethod
+    def as_set(ingredients):
+        return {
+            (item['name'], item['measurement_unit'], item['amount'])
+            for item in ingredients
+        }
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.counters import recount
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики избранного, списков покупок '
+        'и рецептов авторов.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            repaired = recount()
+        for counter, rows in repaired.items():
+            self.stdout.write(f'{counter}: исправлено строк {rows}')
+        self.stdout.write(self.style.SUCCESS('Счетчики пересчитаны.'))
@@ -0,0 +1,338 @@
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from itertools import accumulate, islice
+from random import Random
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+
+from core.catalogue import bump_catalogue_version
+from core.counters import recount
+from core.shopping_cart_service import rebuild_shopping_lists
+from foodgram.models import (Cart, Favorite, Ingredient, Recipe,
+                             RecipeIngredient, Tag)
+from users.models import CustomUser, Subscription
+
+SEED_EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+SEED_PERIOD = timedelta(days=365)
+SEED_PASSWORD = 'seed-password'
+SEED_IMAGE = 'recipes/images/seed.png'
+
+
+class Zipf:
+    """
+    Выбор элементов с вероятностью 1 / rank ** skew.
+    Порядок рангов перемешивается генератором, чтобы популярность
+    не совпадала с порядком id.
+    """
+
+    def __init__(self, items, skew, rng):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(accumulate(
+            1 / rank ** skew for rank in range(1, len(self.items) + 1)
+        ))
+        self.rng = rng
+
+    def weight(self, position):
+        previous = self.cum_weights[position - 1] if position else 0
+        return (self.cum_weights[position] - previous) / self.cum_weights[-1]
+
+    def choice(self):
+        return self.items[bisect_left(
+            self.cum_weights, self.rng.random() * self.cum_weights[-1]
+        )]
+
+    def sample(self, k, exclude=None):
+        """
+        Выбирает k разных элементов, кроме 'exclude'.
+        """
+        k = min(k, len(self.items) - (exclude is not None))
+        if k * 2 > len(self.items):
+            population = [item for item in self.items if item != exclude]
+            return self.rng.sample(population, k)
+        chosen = set()
+        while len(chosen) < k:
+            item = self.choice()
+            if item != exclude:
+                chosen.add(item)
+        return sorted(chosen)
+
+    def split(self, total):
+        """
+        Делит total между элементами пропорционально их весу.
+        :return: Generator пар (элемент, количество).
+        """
+        given = 0
+        for position, item in enumerate(self.items):
+            share = round(total * self.weight(position))
+            share = min(share, total - given)
+            given += share
+            if share:
+                yield item, share
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace(
+        '\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def write_rows(model, columns, rows, batch_size):
+    """
+    Записывает строки в таблицу модели пачками.
+    На PostgreSQL используется COPY, на других базах - executemany.
+    :param model: Модель таблицы.
+    :param columns: Названия полей (attname) в порядке значений.
+    :param rows: Iterable кортежей значений.
+    :param batch_size: Количество строк в пачке.
+    :return: int: Количество записанных строк.
+    """
+    fields = [model._meta.get_field(column) for column in columns]
+    prepare = [
+        (position, field) for position, field in enumerate(fields)
+        if isinstance(field, models.DateTimeField)
+    ]
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    total = 0
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while batch := list(islice(rows, batch_size)):
+            if prepare:
+                batch = [list(row) for row in batch]
+                for row in batch:
+                    for position, field in prepare:
+                        row[position] = field.get_db_prep_save(
+                            row[position], connection
+                        )
+            if connection.vendor == 'postgresql':
+                buffer = StringIO(''.join(
+                    '\t'.join(map(copy_value, row)) + '\n' for row in batch
+                ))
+                sql = f'COPY {table} ({names}) FROM STDIN'
+                if hasattr(cursor, 'copy_expert'):
+                    cursor.copy_expert(sql, buffer)
+                else:
+                    with cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+            else:
+                cursor.executemany(
+                    f'INSERT INTO {table} ({names}) VALUES '
+                    f'({", ".join(["%s"] * len(columns))})',
+                    batch,
+                )
+            total += len(batch)
+    return total
+
+
+def next_id(model):
+    return (model.objects.aggregate(
+        last=models.Max('pk')
+    )['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает синтетические данные для нагрузочного тестирования: '
+        'пользователей, теги, рецепты с ингредиентами, избранное, '
+        'корзины и подписки. Популярность авторов, рецептов '
+        'и ингредиентов распределена по закону Ципфа. '
+        'При одинаковом --seed и исходной базе результат одинаковый.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=20)
+        parser.add_argument(
+            '--ingredients-per-recipe', type=int, default=8,
+            help='Среднее количество ингредиентов в рецепте.',
+        )
+        parser.add_argument('--favorites', type=int, default=50000)
+        parser.add_argument('--carts', type=int, default=20000)
+        parser.add_argument('--subscriptions', type=int, default=20000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель распределения Ципфа.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество строк в одном INSERT или COPY.',
+        )
+        parser.add_argument(
+            '--ingredients',
+            default=os.path.join(settings.BASE_DIR, 'data/ingredients.json'),
+            help='Файл ингредиентов для load_ingredients.',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['recipes'] < 1:
+            raise CommandError('Нужно минимум 2 пользователя и 1 рецепт.')
+        self.options = options
+        self.rng = Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = perf_counter()
+        call_command('load_ingredients', options['ingredients'],
+                     stdout=self.stdout)
+        ingredient_ids = list(
+            Ingredient.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError('Справочник ингредиентов пуст.')
+        with transaction.atomic():
+            users = self.create_users()
+            tags = self.create_tags()
+            recipes = self.create_recipes(users, tags, ingredient_ids)
+            self.create_pairs(Favorite, 'user_id', 'recipe_id', users,
+                              recipes, options['favorites'])
+            self.create_pairs(Cart, 'user_id', 'recipe_id', users,
+                              recipes, options['carts'])
+            self.create_pairs(Subscription, 'username_id', 'author_id',
+                              users, users, options['subscriptions'])
+            self.reset_sequences()
+            recount()
+            rebuild_shopping_lists()
+        bump_catalogue_version(Tag)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {perf_counter() - started:.1f} с.'
+        ))
+
+    def report(self, model, count, started):
+        self.stdout.write(
+            f'{model._meta.db_table}: {count} строк, '
+            f'{perf_counter() - started:.1f} с.'
+        )
+
+    def create_users(self):
+        started = perf_counter()
+        first = next_id(CustomUser)
+        ids = range(first, first + self.options['users'])
+        password = make_password(SEED_PASSWORD)
+        count = write_rows(
+            CustomUser,
+            ('id', 'password', 'is_superuser', 'username', 'first_name',
+             'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+             'recipes_count'),
+            (
+                (pk, password, False, f'seed_{pk}', f'Имя{pk}',
+                 f'Фамилия{pk}', f'seed_{pk}@example.com', False, True,
+                 SEED_EPOCH, 0)
+                for pk in ids
+            ),
+            self.batch_size,
+        )
+        self.report(CustomUser, count, started)
+        return Zipf(ids, self.options['skew'], self.rng)
+
+    def create_tags(self):
+        started = perf_counter()
+        first = next_id(Tag)
+        ids = range(first, first + self.options['tags'])
+        count = write_rows(
+            Tag,
+            ('id', 'name', 'color', 'slug'),
+            (
+                (pk, f'Тег {pk}', f'#{pk:06X}'[-7:], f'seed-{pk}')
+                for pk in ids
+            ),
+            self.batch_size,
+        )
+        self.report(Tag, count, started)
+        return Zipf(ids, self.options['skew'], self.rng)
+
+    def create_recipes(self, users, tags, ingredient_ids):
+        """
+        Создает рецепты, их теги и ингредиенты пачками по batch_size
+        рецептов. Авторы, теги и ингредиенты выбираются с учетом
+        популярности.
+        """
+        started = perf_counter()
+        rng = self.rng
+        names = dict(Ingredient.objects.values_list('pk', 'name'))
+        ingredients = Zipf(ingredient_ids, self.options['skew'], rng)
+        average = self.options['ingredients_per_recipe']
+        first = next_id(Recipe)
+        count = self.options['recipes']
+        ids = range(first, first + count)
+        step = SEED_PERIOD / count
+        totals = {Recipe: 0, RecipeIngredient: 0, Recipe.tags.through: 0}
+        for offset in range(0, count, self.batch_size):
+            recipes, links, tag_links = [], [], []
+            for position in range(offset, min(offset + self.batch_size,
+                                              count)):
+                pk = ids[position]
+                chosen = ingredients.sample(
+                    max(1, round(rng.gauss(average, average / 3)))
+                )
+                links.extend(
+                    (pk, ingredient, rng.randint(1, 500))
+                    for ingredient in chosen
+                )
+                tag_links.extend(
+                    (pk, tag) for tag in tags.sample(rng.randint(1, 3))
+                )
+                recipes.append((
+                    pk, users.choice(),
+                    f'{names[chosen[0]].capitalize()} №{pk}', SEED_IMAGE,
+                    'Нужно: ' + ', '.join(names[item] for item in chosen),
+                    min(1 + int(rng.expovariate(1 / 3)), 10),
+                    SEED_EPOCH + step * position, 0, 0, 1,
+                ))
+            totals[Recipe] += write_rows(
+                Recipe,
+                ('id', 'author_id', 'name', 'image', 'text',
+                 'cooking_time', 'created', 'favorites_count',
+                 'in_cart_count', 'version'),
+                recipes, self.batch_size,
+            )
+            totals[RecipeIngredient] += write_rows(
+                RecipeIngredient, ('recipe_id', 'ingredient_id', 'amount'),
+                links, self.batch_size,
+            )
+            totals[Recipe.tags.through] += write_rows(
+                Recipe.tags.through, ('recipe_id', 'tag_id'),
+                tag_links, self.batch_size,
+            )
+        for model, rows in totals.items():
+            self.report(model, rows, started)
+        return Zipf(ids, self.options['skew'], rng)
+
+    def create_pairs(self, model, owner_field, target_field, owners,
+                     targets, total):
+        """
+        Создает total уникальных пар (владелец, объект).
+        Активность владельцев и популярность объектов
+        распределены по закону Ципфа, пары с собой пропускаются.
+        """
+        started = perf_counter()
+        rows = (
+            (owner, target)
+            for owner, share in owners.split(total)
+            for target in targets.sample(
+                share, exclude=owner if targets is owners else None
+            )
+        )
+        self.report(model, write_rows(
+            model, (owner_field, target_field), rows, self.batch_size,
+        ), started)
+
+    def reset_sequences(self):
+        sql = connection.ops.sequence_reset_sql(
+            no_style(), [CustomUser, Tag, Recipe]
+        )
+        if sql:
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
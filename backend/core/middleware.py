@@ -0,0 +1,94 @@
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+
+from core.instrumentation import RequestTimings, current_timings, route_metrics
+
+
+class InstrumentationMiddleware:
+    """
+    Замеряет фазы запроса: запросы к базе (время и количество),
+    представление с сериализаторами и отрисовку ответа.
+    Записывает время ответа в гистограмму маршрута
+    (core.instrumentation.route_metrics). Заголовок Server-Timing
+    добавляется для персонала или для всех при settings.SERVER_TIMING.
+    Работает и с синхронными, и с асинхронными представлениями.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(
+            request, response, timings, self.show_timings(request)
+        )
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+            # Пользователь сессии еще не загружен, а запрос к базе
+            # в цикле событий запрещен.
+            show_timings = await sync_to_async(self.show_timings)(request)
+        else:
+            show_timings = self.show_timings(request)
+        return self.finish(request, response, timings, show_timings)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.start_view()
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        if timings is not None:
+            timings.start_render()
+            response.add_post_render_callback(
+                lambda response: timings.finish_render()
+            )
+        return response
+
+    def finish(self, request, response, timings, show_timings):
+        if timings.render_started is None:
+            timings.finish_view()
+        total = timings.total
+        if show_timings:
+            response['Server-Timing'] = timings.server_timing(total)
+        match = request.resolver_match
+        if match is None:
+            route = 'unmatched'
+        elif match.url_name:
+            route = match.view_name
+        else:
+            route = match.route
+        route_metrics.observe(route, request.method, timings, total)
+        return response
+
+    @staticmethod
+    def show_timings(request):
+        """
+        Пользователя ставят AuthenticationMiddleware (сессия)
+        и DRF (токен), к концу запроса он уже известен.
+        """
+        if settings.SERVER_TIMING:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
@@ -0,0 +1,61 @@
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from core.catalogue import get_catalogue_etag, get_catalogue_version
+from core.serializers import BatchSerializer
+
+
+class CatalogueConditionalMixin:
+    """
+    Добавляет к списку справочника заголовок ETag.
+    Если у клиента актуальная версия (If-None-Match),
+    возвращается 304 без обращения к базе и сериализатору.
+    Сам список формирует метод 'catalogue_list'.
+    """
+
+    def list(self, request, *args, **kwargs):
+        version = get_catalogue_version(self.queryset.model)
+        etag = get_catalogue_etag(
+            version, request.get_full_path(), request.accepted_media_type
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.catalogue_list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    def catalogue_list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class BatchActionMixin:
+    """
+    Пакетные действия над связями пользователя.
+    Тело запроса - {"ids": [...]} (не больше BATCH_MAX_SIZE ID),
+    ответ - результат для каждого ID в порядке запроса:
+    {"results": [{"id": 1, "success": true},
+                 {"id": 2, "success": false, "errors": "..."}]}.
+    """
+
+    def get_batch_ids(self):
+        """
+        :return: list: ID из тела запроса без повторов.
+        """
+        serializer = BatchSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['ids']
+
+    @staticmethod
+    def batch_response(ids, done, get_error):
+        """
+        :param ids: ID из запроса.
+        :param done: set: ID, для которых действие выполнено.
+        :param get_error: Функция, возвращающая сообщение об ошибке
+            для остальных ID.
+        :return: Response.
+        """
+        return Response({'results': [
+            {'id': pk, 'success': True} if pk in done
+            else {'id': pk, 'success': False, 'errors': get_error(pk)}
+            for pk in ids
+        ]})
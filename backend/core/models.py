@@ -0,0 +1,21 @@
+class QueryUpdatedFieldsMixin:
+    """
+    Поля модели из query_updated_fields меняются только запросами
+    UPDATE с F() (счетчики core.counters, версия рецепта). save()
+    существующей строки их не записывает: экземпляр, загруженный
+    до такого запроса (PATCH, форма админки), вернул бы в строку
+    старое значение.
+    """
+    query_updated_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.query_updated_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
@@ -0,0 +1,18 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class FormatParameterNegotiation(DefaultContentNegotiation):
+    """
+    Выбор формата только по параметру 'format' (или суффиксу адреса).
+    Заголовок Accept не учитывается: без параметра отдается формат
+    первого рендерера, даже если клиент прислал Accept: application/json.
+    Неизвестный формат - 404, как в DefaultContentNegotiation.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        format = format_suffix or request.query_params.get(
+            self.settings.URL_FORMAT_OVERRIDE
+        )
+        if format:
+            renderers = self.filter_renderers(renderers, format)
+        return renderers[0], renderers[0].media_type
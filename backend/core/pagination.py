@@ -1,4 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (BasePagination, PageNumberPagination,
+                                       replace_query_param)
+from rest_framework.response import Response
 
 
 class LimitPagePagination(PageNumberPagination):
@@ -7,3 +18,207 @@ class LimitPagePagination(PageNumberPagination):
         основаваясь на параметре запроса 'limit'.
     """
     page_size_query_param = 'limit'
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Асинхронный вариант 'paginate_queryset': количество элементов
+        и страница запрашиваются через асинхронный ORM.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        self.request = request
+        return list(self.page)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная разбивка на страницы по ключу ('-created', '-id').
+    Следующая страница выбирается условием по ключу крайнего элемента,
+    без OFFSET и без подсчета общего количества.
+    Курсор передается в параметре запроса 'cursor'.
+    Другая сортировка (параметр 'ordering', ранг поиска) с курсором
+    не сочетается: запрос отклоняется с ошибкой 400.
+    """
+    cursor_query_param = 'cursor'
+    # Сортировки queryset, совпадающие с ключом курсора.
+    keyset_orderings = ((), ('-created',), ('-created', '-id'))
+    page_size_query_param = 'limit'
+    page_size = 6
+    max_page_size = 100
+    invalid_cursor_message = 'Неверный курсор.'
+    invalid_ordering_message = (
+        'Курсор работает только с сортировкой по дате создания '
+        '(без параметров ordering и search).'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Асинхронный вариант 'paginate_queryset'.
+        """
+        return self.set_page([
+            obj async for obj in self.get_page_queryset(queryset, request)
+        ])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Возвращает queryset страницы: limit + 1 элементов после
+        курсора, лишний элемент показывает, есть ли следующая страница.
+        """
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        self.cursor = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param)
+        )
+        if tuple(queryset.query.order_by) not in self.keyset_orderings:
+            raise ValidationError(
+                {self.cursor_query_param: [self.invalid_ordering_message]}
+            )
+        queryset = queryset.order_by('-created', '-id')
+        if self.cursor is not None:
+            created, pk, reverse = self.cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created__gt=created) | Q(created=created, id__gt=pk)
+                ).order_by('created', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(created__lt=created) | Q(created=created, id__lt=pk)
+                )
+        return queryset[:self.limit + 1]
+
+    def set_page(self, results):
+        """
+        Запоминает страницу и наличие соседних страниц.
+        :param results: Список из 'get_page_queryset()'.
+        :return: Элементы страницы.
+        """
+        reverse = self.cursor is not None and self.cursor[2]
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            created, pk, reverse = urlsafe_b64decode(
+                encoded.encode()
+            ).decode().split('|')
+            return datetime.fromisoformat(created), int(pk), reverse == '1'
+        except (BinasciiError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, recipe, reverse):
+        cursor = f'{recipe.created.isoformat()}|{recipe.id}|{int(reverse)}'
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            urlsafe_b64encode(cursor.encode()).decode(),
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class RecipePagination(LimitPagePagination):
+    """
+    Разбивка ленты рецептов на страницы.
+    По умолчанию работает по параметрам 'page' и 'limit'.
+    Если в запросе есть параметр 'cursor' (для первой страницы - пустой),
+    используется курсорная разбивка KeysetPagination без подсчета
+    количества рецептов.
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(
+                queryset, request, view
+            )
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки для больших таблиц.
+    Для списка без фильтров на PostgreSQL количество строк берется
+    из статистики планировщика (pg_class.reltuples) вместо COUNT(*),
+    если таблица больше 'estimate_threshold' строк.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if (
+            query is not None
+            and not query.where
+            and connection.vendor == 'postgresql'
+        ):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    (self.object_list.model._meta.db_table,),
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.estimate_threshold:
+                return int(row[0])
+        return super().count
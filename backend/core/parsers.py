@@ -0,0 +1,32 @@
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from core.renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser на orjson для тел запросов в UTF-8.
+    Если orjson не установлен, тело в другой кодировке или orjson
+    не разобрал его, разбор выполняет JSONParser: ошибки и редкие
+    случаи (одиночные суррогаты в строках, числа вне диапазона double)
+    обрабатываются так же, как раньше.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower() not in (
+            'utf-8', 'utf8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read() if stream is not None else b''
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                BytesIO(body), media_type, parser_context
+            )
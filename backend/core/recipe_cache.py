@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+
+RECIPE_BODY_KEY = 'recipe_body:{prefix}:{id}:{version}'
+RECIPE_BODY_TIMEOUT = 60 * 60
+RECIPE_BODY_CACHE = 'recipes'
+
+
+class RecipeBodyCache:
+    """
+    Двухуровневый кэш общей для всех пользователей части рецепта.
+    Первый уровень - LRU в памяти процесса, второй - кэш Django
+    'recipes' (settings.CACHES).
+    Ключ включает версию рецепта, которая увеличивается при каждом
+    изменении рецепта, его тегов или ингредиентов, поэтому после
+    изменения старое представление не может быть отдано.
+    """
+
+    def __init__(self, maxsize=1024, timeout=RECIPE_BODY_TIMEOUT,
+                 alias=RECIPE_BODY_CACHE):
+        self.maxsize = maxsize
+        self.alias = alias
+        self.timeout = timeout
+        self._local = OrderedDict()
+        self._lock = Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(prefix, recipe):
+        return RECIPE_BODY_KEY.format(
+            prefix=prefix, id=recipe.id, version=recipe.version,
+        )
+
+    def get(self, key):
+        """
+        Возвращает представление рецепта или None.
+        :param key: Ключ из make_key().
+        :return: dict или None.
+        """
+        with self._lock:
+            body = self._local.get(key)
+            if body is not None:
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return body
+        body = caches[self.alias].get(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._remember(key, body)
+        return body
+
+    def set(self, key, body):
+        """
+        Сохраняет представление рецепта на обоих уровнях.
+        :param key: Ключ из make_key().
+        :param body: dict: Представление рецепта.
+        :return: None
+        """
+        caches[self.alias].set(key, body, self.timeout)
+        with self._lock:
+            self._remember(key, body)
+
+    def _remember(self, key, body):
+        self._local[key] = body
+        self._local.move_to_end(key)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+
+    def stats(self):
+        """
+        Счетчики попаданий в кэш текущего процесса.
+        :return: dict.
+        """
+        requests = self.local_hits + self.shared_hits + self.misses
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': (
+                (self.local_hits + self.shared_hits) / requests
+                if requests else 0.0
+            ),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+
+recipe_body_cache = RecipeBodyCache()
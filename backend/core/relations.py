@@ -0,0 +1,193 @@
+from django.db import connection
+from django.db.models.constants import OnConflict
+from django.dispatch import Signal
+
+# Отправляется после добавления (action='post_add') и удаления
+# (action='post_remove') связей функциями этого модуля. Запросы
+# выполняются без загрузки объектов, поэтому post_save и post_delete
+# для этих строк не отправляются, как и для m2m связей
+# (сравните с m2m_changed). Аргументы: sender - модель связи,
+# owner_field, owner_id, target_field, pk_set - ID объектов.
+relations_changed = Signal()
+
+
+def insert_relations_sql(model, owner_field, target_field, count):
+    """
+    Запрос INSERT ... SELECT ... ON CONFLICT DO NOTHING для связей
+    владельца с объектами.
+    Строки добавляются только для существующих объектов,
+    уже существующие связи пропускаются без IntegrityError.
+    :param model: Модель связи с уникальным ограничением на пару полей.
+    :param owner_field: Поле владельца (пользователь).
+    :param target_field: Поле объекта (рецепт, автор).
+    :param count: Количество ID объектов в запросе.
+    :return: tuple: SQL с параметрами ID владельца и ID объектов
+        и поле объекта.
+    """
+    ops = connection.ops
+    fields = [model._meta.get_field(owner_field),
+              model._meta.get_field(target_field)]
+    target = fields[1].related_model._meta
+    target_pk = ops.quote_name(target.pk.column)
+    return ' '.join((
+        ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        ops.quote_name(model._meta.db_table),
+        f'({", ".join(ops.quote_name(field.column) for field in fields)})',
+        f'SELECT %s, {target_pk}',
+        f'FROM {ops.quote_name(target.db_table)}',
+        f'WHERE {target_pk} IN ({", ".join(["%s"] * count)})',
+        ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None),
+    )), fields[1]
+
+
+def add_relations(model, owner_field, owner_id, target_field, target_ids):
+    """
+    Добавляет связи владельца с объектами одним запросом.
+    Добавленные строки возвращаются через RETURNING, поэтому
+    повторные и одновременные запросы не учитываются дважды.
+    На базах без RETURNING связи добавляются по одной.
+    :param model: Модель связи.
+    :param owner_field: Поле владельца.
+    :param owner_id: ID владельца.
+    :param target_field: Поле объекта.
+    :param target_ids: ID объектов.
+    :return: set: ID объектов, связи с которыми добавлены.
+    """
+    target_ids = list(target_ids)
+    if not target_ids:
+        return set()
+    if connection.features.can_return_rows_from_bulk_insert:
+        sql, field = insert_relations_sql(
+            model, owner_field, target_field, len(target_ids)
+        )
+        returning, _ = connection.ops.return_insert_columns([field])
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} {returning}', (owner_id, *target_ids))
+            added = {row[0] for row in cursor.fetchall()}
+    else:
+        added = {
+            target_id for target_id in target_ids
+            if insert_relation(model, owner_field, owner_id,
+                               target_field, target_id)
+        }
+    send_relations_changed(model, 'post_add', owner_field, owner_id,
+                           target_field, added)
+    return added
+
+
+def insert_relation(model, owner_field, owner_id, target_field, target_id):
+    """
+    Добавляет одну связь запросом из 'insert_relations_sql'
+    без отправки 'relations_changed'.
+    :return: bool: Связь добавлена.
+    """
+    sql, _ = insert_relations_sql(model, owner_field, target_field, 1)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (owner_id, target_id))
+        return cursor.rowcount == 1
+
+
+def add_relation(model, owner_field, owner_id, target_field, target_id):
+    """
+    Добавляет одну связь запросом из 'insert_relations_sql'.
+    :return: bool: Связь добавлена.
+    """
+    added = insert_relation(model, owner_field, owner_id,
+                            target_field, target_id)
+    if added:
+        send_relations_changed(model, 'post_add', owner_field, owner_id,
+                               target_field, {target_id})
+    return added
+
+
+def remove_relations(model, owner_field, owner_id, target_field,
+                     target_ids):
+    """
+    Удаляет связи владельца с объектами одним запросом
+    DELETE ... RETURNING без post_delete, об удалении сообщает
+    'relations_changed'. Возвращаются только строки, удаленные этим
+    запросом, поэтому одновременные запросы не учитывают одну связь
+    дважды. На базах без RETURNING строки сначала блокируются
+    SELECT ... FOR UPDATE.
+    :param model: Модель связи.
+    :param owner_field: Поле владельца.
+    :param owner_id: ID владельца.
+    :param target_field: Поле объекта.
+    :param target_ids: ID объектов.
+    :return: set: ID объектов, связи с которыми удалены.
+    """
+    target_ids = list(target_ids)
+    if not target_ids:
+        return set()
+    owner_column = model._meta.get_field(owner_field).column
+    target_column = model._meta.get_field(target_field).column
+    if connection.features.can_return_rows_from_bulk_insert:
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join((
+                f'DELETE FROM {quote_name(model._meta.db_table)}',
+                f'WHERE {quote_name(owner_column)} = %s',
+                f'AND {quote_name(target_column)}',
+                f'IN ({", ".join(["%s"] * len(target_ids))})',
+                f'RETURNING {quote_name(target_column)}',
+            )), (owner_id, *target_ids))
+            removed = {row[0] for row in cursor.fetchall()}
+    else:
+        rows = dict(model.objects.select_for_update().filter(**{
+            owner_column: owner_id,
+            f'{target_column}__in': target_ids,
+        }).values_list('pk', target_column))
+        removed = set(rows.values())
+        if rows:
+            queryset = model.objects.filter(pk__in=rows)
+            queryset._raw_delete(queryset.db)
+    send_relations_changed(model, 'post_remove', owner_field, owner_id,
+                           target_field, removed)
+    return removed
+
+
+def send_relations_changed(model, action, owner_field, owner_id,
+                           target_field, pk_set):
+    """
+    Отправляет 'relations_changed', если связи изменились.
+    :return: None
+    """
+    if pk_set:
+        relations_changed.send(
+            sender=model,
+            action=action,
+            owner_field=owner_field,
+            owner_id=owner_id,
+            target_field=target_field,
+            pk_set=pk_set,
+            using=connection.alias,
+        )
+
+
+def add_recipe_relation(model, user_id, recipe_id):
+    """
+    Добавляет связь пользователя с рецептом (избранное, корзина)
+    одним запросом INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    Строка не добавляется, если рецепта нет или связь уже есть,
+    поэтому повторные и одновременные запросы не создают дублей
+    и не вызывают IntegrityError.
+    :param model: Модель связи с полями 'user' и 'recipe'
+        и уникальным ограничением на эту пару.
+    :param user_id: ID пользователя.
+    :param recipe_id: ID рецепта.
+    :return: bool: Связь добавлена.
+    """
+    return add_relation(model, 'user', user_id, 'recipe', recipe_id)
+
+
+def remove_recipe_relation(model, user_id, recipe_id):
+    """
+    Удаляет связь пользователя с рецептом одним запросом
+    из 'remove_relations'.
+    :param model: Модель связи с полями 'user' и 'recipe'.
+    :param user_id: ID пользователя.
+    :param recipe_id: ID рецепта.
+    :return: bool: Связь удалена.
+    """
+    return bool(remove_relations(model, 'user', user_id,
+                                 'recipe', (recipe_id,)))
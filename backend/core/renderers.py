@@ -0,0 +1,93 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Отдает данные без изменений.
+    Используется для выбора формата файла, который представление
+    формирует само.
+    """
+    media_type = ''
+    format = ''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class PDFRenderer(PassthroughRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+
+
+class PlainTextRenderer(PassthroughRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class PrometheusRenderer(PassthroughRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return str(data).encode(self.charset)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson.
+    Ответ совпадает с JSONRenderer побайтно: UTF-8 без экранирования
+    кириллицы, компактные разделители, экранированные \u2028 и \u2029.
+    Даты, Decimal, ленивые строки и другие типы, которые orjson
+    выводит иначе, передаются кодировщику DRF.
+    Кроме чисел с плавающей точкой с порядком: orjson пишет 1e20
+    и 1e-7, JSONRenderer - 1e+20 и 1e-07 (значения те же), а NaN
+    и бесконечность orjson записывает как null, где JSONRenderer
+    отвечает ошибкой. Поля API таких чисел не содержат, а поиск
+    их в ответе обходится дороже самого orjson.
+    Для отступов (Browsable API, `; indent=4`), настроек UNICODE_JSON
+    и COMPACT_JSON, отличных от умолчаний, без установленного orjson
+    и для данных, которые orjson не кодирует (например, целые больше
+    64 бит), используется JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(
+                b'\xe2\x80\xa8', b'\\u2028'
+            ).replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
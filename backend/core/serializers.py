@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+BATCH_MAX_SIZE = 500
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Список ID для пакетных действий, например {"ids": [1, 2, 3]}.
+    Повторяющиеся ID учитываются один раз.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_SIZE,
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
@@ -1,62 +1,335 @@
-from django.db.models import Sum
-from foodgram.models import Ingredient
+import csv
+import json
+import os
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from foodgram.models import (Cart, Ingredient, RecipeIngredient,
+                             ShoppingCartIngredient)
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+PDF_FONT = 'HelveticaBlack'
+PDF_FONT_SIZE = 14
+PDF_LEFT = 100
+PDF_TITLE_TOP = 800
+PDF_LIST_TOP = 750
+PDF_BOTTOM = 50
+PDF_LINE_HEIGHT = 20
+PDF_SPOOL_SIZE = 1024 * 1024
 
 
 def get_ingredients(user_id):
     """
-    Получает ингридиенты из рецептов, добавленных в список покупок.
+    Получает ингридиенты из списка покупок пользователя.
+    Данные читаются из таблицы ShoppingCartIngredient, которая обновляется
+    при изменении корзины и ингредиентов рецептов.
+    :param user_id: ID пользователя.
+    :return: QuerySet с суммой всех ингредиентов в списке покупок.
+    """
+    return ShoppingCartIngredient.objects.filter(
+        user=user_id
+    ).values(
+        'amount',
+        name=F('ingredient__name'),
+        measurement_unit=F('ingredient__measurement_unit'),
+    ).order_by('ingredient__name')
+
+
+def calculate_ingredients(user_id):
+    """
+    Считает ингридиенты из рецептов, добавленных в список покупок,
+    напрямую по таблицам рецептов.
+    Используется для проверки таблицы ShoppingCartIngredient.
     :param user_id: ID пользователя.
     :return: QuerySet с суммой всех ингредиентов в списке покупок.
     """
     return Ingredient.objects.filter(
         recipeingredient__recipe__in_cart__user=user_id
-    ).select_related('recipeingredient').annotate(
+    ).annotate(
         amount=Sum('recipeingredient__amount')
     ).values('name', 'amount', 'measurement_unit')
 
 
-def generate_final_list(ingredients):
+def get_recipe_amounts(recipe_id):
     """
-    Создает список покупок с ингридиентами.
-    :param ingredients: QuerySet с суммой всех ингредиентов.
-    :return:
-        dict: Финальный список покупок с названиями ингредиентов 'keys'
-        и количеством/единицами измерения 'values'
+    Возвращает количество каждого ингредиента в рецепте.
+    :param recipe_id: ID рецепта.
+    :return: dict: ID ингредиента 'keys' и количество 'values'.
     """
-    shopping_cart = {}
-    shopping_cart = {
-        item['name']: {
-            'measurement_unit': item['measurement_unit'],
-            'amount': item['amount']
-        } if item['name'] not in shopping_cart
-        else {
-            'measurement_unit': item['measurement_unit'],
-            'amount': shopping_cart[item['name']]['amount'] + item[
-                'amount']
-        }
-        for item in ingredients
+    return dict(
+        RecipeIngredient.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredient_id', 'amount')
+    )
+
+
+def get_recipes_amounts(recipe_ids):
+    """
+    Возвращает суммарное количество каждого ингредиента в рецептах.
+    :param recipe_ids: ID рецептов.
+    :return: dict: ID ингредиента 'keys' и количество 'values'.
+    """
+    return dict(
+        RecipeIngredient.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values('ingredient_id').annotate(
+            total=Sum('amount')
+        ).values_list('ingredient_id', 'total').order_by()
+    )
+
+
+def update_shopping_lists(user_ids, deltas):
+    """
+    Изменяет количество ингредиентов в списках покупок пользователей.
+    Строки с нулевым количеством удаляются.
+    Должна вызываться в той же транзакции, что и изменение корзины.
+    :param user_ids: ID пользователей, чьи списки нужно изменить.
+    :param deltas: dict: ID ингредиента 'keys' и изменение количества
+        'values'.
+    :return: None
+    """
+    user_ids = list(user_ids)
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not user_ids or not deltas:
+        return
+    ShoppingCartIngredient.objects.bulk_create(
+        [
+            ShoppingCartIngredient(user_id=user_id, ingredient_id=pk)
+            for user_id in user_ids
+            for pk, delta in deltas.items() if delta > 0
+        ],
+        ignore_conflicts=True,
+    )
+    items = ShoppingCartIngredient.objects.filter(
+        user_id__in=user_ids,
+        ingredient_id__in=deltas,
+    )
+    items.update(amount=F('amount') + Case(
+        *(When(ingredient_id=pk, then=Value(delta))
+          for pk, delta in deltas.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+    items.filter(amount__lte=0).delete()
+
+
+def add_to_shopping_lists(user_ids, recipe_id):
+    """
+    Добавляет ингредиенты рецепта в списки покупок пользователей.
+    :param user_ids: ID пользователей.
+    :param recipe_id: ID рецепта.
+    :return: None
+    """
+    update_shopping_lists(user_ids, get_recipe_amounts(recipe_id))
+
+
+def remove_from_shopping_lists(user_ids, recipe_id):
+    """
+    Вычитает ингредиенты рецепта из списков покупок пользователей.
+    :param user_ids: ID пользователей.
+    :param recipe_id: ID рецепта.
+    :return: None
+    """
+    update_shopping_lists(user_ids, {
+        pk: -amount for pk, amount in get_recipe_amounts(recipe_id).items()
+    })
+
+
+def add_recipes_to_shopping_list(user_id, recipe_ids):
+    """
+    Добавляет ингредиенты нескольких рецептов в список покупок
+    пользователя одним обновлением.
+    :param user_id: ID пользователя.
+    :param recipe_ids: ID рецептов.
+    :return: None
+    """
+    if recipe_ids:
+        update_shopping_lists((user_id,), get_recipes_amounts(recipe_ids))
+
+
+def remove_recipes_from_shopping_list(user_id, recipe_ids):
+    """
+    Вычитает ингредиенты нескольких рецептов из списка покупок
+    пользователя одним обновлением.
+    :param user_id: ID пользователя.
+    :param recipe_ids: ID рецептов.
+    :return: None
+    """
+    if recipe_ids:
+        update_shopping_lists((user_id,), {
+            pk: -amount
+            for pk, amount in get_recipes_amounts(recipe_ids).items()
+        })
+
+
+def change_recipe_amounts(recipe_id, old_amounts, new_amounts):
+    """
+    Переносит изменение ингредиентов рецепта в списки покупок
+    всех пользователей, у которых рецепт в корзине.
+    :param recipe_id: ID рецепта.
+    :param old_amounts: dict: ингредиенты рецепта до изменения.
+    :param new_amounts: dict: ингредиенты рецепта после изменения.
+    :return: None
+    """
+    deltas = {
+        pk: new_amounts.get(pk, 0) - old_amounts.get(pk, 0)
+        for pk in old_amounts.keys() | new_amounts.keys()
     }
-    return shopping_cart
+    update_shopping_lists(
+        Cart.objects.filter(recipe_id=recipe_id).values_list(
+            'user_id', flat=True),
+        deltas,
+    )
+
+
+def rebuild_shopping_lists():
+    """
+    Пересобирает таблицу ShoppingCartIngredient по корзинам пользователей.
+    :return: int: Количество созданных строк.
+    """
+    totals = RecipeIngredient.objects.filter(
+        recipe__in_cart__isnull=False
+    ).values(
+        'ingredient_id', user_id=F('recipe__in_cart__user'),
+    ).annotate(
+        total=Sum('amount')
+    ).order_by()
+    ShoppingCartIngredient.objects.all().delete()
+    created = ShoppingCartIngredient.objects.bulk_create(
+        (
+            ShoppingCartIngredient(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['total'],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+    return len(created)
 
 
-def draw_shopping_cart(page, shopping_cart):
+@lru_cache(maxsize=None)
+def register_fonts():
     """
-    Создает список на PDF странице, используется библиотека 'reportlab'.
-    :param page: canvas.Canvas: PDF страница для разметки.
-    :param shopping_cart:
-        Dict: Представление 'shopping cart',
-        возвращаемое функцией 'generate_final_list()'.
+    Регистрирует шрифт для PDF один раз на процесс.
+    :return: str: Название зарегистрированного шрифта.
+    """
+    pdfmetrics.registerFont(TTFont(
+        PDF_FONT,
+        os.path.join(settings.BASE_DIR, 'core/HelveticaBlack.ttf'),
+        'UTF-8',
+    ))
+    return PDF_FONT
+
+
+def draw_shopping_cart(page, ingredients):
+    """
+    Создает список на PDF страницах, используется библиотека 'reportlab'.
+    Когда строки не помещаются на страницу, список продолжается
+    на следующей.
+    :param page: canvas.Canvas: PDF документ для разметки.
+    :param ingredients:
+        Iterable: Ингредиенты с ключами 'name', 'amount'
+        и 'measurement_unit', возвращаемые функцией 'get_ingredients()'.
     :return:
     """
-    page.setFont('HelveticaBlack', 14)
-    page.drawString(100, 800, 'Список ингридиентов:')
-    height = 750
-    for position, (name, data) in enumerate(shopping_cart.items(), 1):
-        amount = str(data['amount'])
-        measurement_unit = data['measurement_unit']
+    page.setFont(PDF_FONT, PDF_FONT_SIZE)
+    page.drawString(PDF_LEFT, PDF_TITLE_TOP, 'Список ингридиентов:')
+    height = PDF_LIST_TOP
+    for position, item in enumerate(ingredients, 1):
+        if height < PDF_BOTTOM:
+            page.showPage()
+            page.setFont(PDF_FONT, PDF_FONT_SIZE)
+            height = PDF_TITLE_TOP
         page.drawString(
-            100, height, (
-                f'{position}. {name} - {amount}, {measurement_unit}'
+            PDF_LEFT, height, (
+                f'{position}. {item["name"]} - {item["amount"]}, '
+                f'{item["measurement_unit"]}'
             )
         )
-        height -= 20
+        height -= PDF_LINE_HEIGHT
+    page.showPage()
+
+
+def render_shopping_cart(ingredients):
+    """
+    Создает PDF файл со списком покупок.
+    Документ пишется во временный файл, который остается в памяти,
+    пока не превысит PDF_SPOOL_SIZE, и затем переносится на диск.
+    :param ingredients: Iterable: Ингредиенты из 'get_ingredients()'.
+    :return: Файл с PDF документом, позиционированный на начало.
+    """
+    register_fonts()
+    pdf_file = SpooledTemporaryFile(max_size=PDF_SPOOL_SIZE)
+    page = canvas.Canvas(pdf_file)
+    draw_shopping_cart(page, ingredients)
+    page.save()
+    pdf_file.seek(0)
+    return pdf_file
+
+
+class Echo:
+    """
+    Объект с интерфейсом файла, возвращающий записанную строку.
+    Позволяет отдавать строки csv.writer по одной.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_shopping_cart_txt(ingredients):
+    """
+    Построчно формирует список покупок в текстовом виде.
+    :param ingredients: Iterable: Ингредиенты из 'get_ingredients()'.
+    :return: Generator строк.
+    """
+    yield 'Список ингридиентов:\n'
+    for position, item in enumerate(ingredients, 1):
+        yield (
+            f'{position}. {item["name"]} - {item["amount"]}, '
+            f'{item["measurement_unit"]}\n'
+        )
+
+
+def iter_shopping_cart_csv(ingredients):
+    """
+    Построчно формирует список покупок в формате CSV.
+    :param ingredients: Iterable: Ингредиенты из 'get_ingredients()'.
+    :return: Generator строк.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'amount', 'measurement_unit'))
+    for item in ingredients:
+        yield writer.writerow(
+            (item['name'], item['amount'], item['measurement_unit'])
+        )
+
+
+def iter_shopping_cart_json(ingredients):
+    """
+    Поэлементно формирует список покупок в виде JSON массива.
+    :param ingredients: Iterable: Ингредиенты из 'get_ingredients()'.
+    :return: Generator строк.
+    """
+    separator = '['
+    for item in ingredients:
+        yield separator + json.dumps({
+            'name': item['name'],
+            'amount': item['amount'],
+            'measurement_unit': item['measurement_unit'],
+        }, ensure_ascii=False)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+SHOPPING_CART_EXPORTS = {
+    'txt': iter_shopping_cart_txt,
+    'csv': iter_shopping_cart_csv,
+    'json': iter_shopping_cart_json,
+}
@@ -0,0 +1,12 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.instrumentation import install_query_timer
+
+
+@receiver(connection_created)
+def time_connection_queries(sender, connection, **kwargs):
+    """
+    Подключает замер запросов к каждому новому соединению с базой.
+    """
+    install_query_timer(connection)
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.functional import SimpleLazyObject
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from conftest import create_user
+from core.middleware import InstrumentationMiddleware
+from users.models import CustomUser
+
+
+@pytest.mark.django_db
+def test_slow_query_log_has_no_params(settings, caplog):
+    settings.SLOW_QUERY_MS = 0
+    with caplog.at_level(logging.WARNING, logger='foodgram.db'):
+        user = create_user('slow')
+        token = Token.objects.create(user=user)
+    assert 'Медленный запрос' in caplog.text
+    assert token.key not in caplog.text
+    assert user.password not in caplog.text
+
+
+@pytest.mark.django_db
+def test_server_timing_for_staff_only(api_client, user):
+    assert 'Server-Timing' not in api_client.get('/api/tags/')
+    client = APIClient()
+    client.force_authenticate(user)
+    assert 'Server-Timing' not in client.get('/api/tags/')
+    client.force_authenticate(create_user('staff', is_staff=True))
+    assert 'db;dur=' in client.get('/api/tags/')['Server-Timing']
+
+
+@pytest.mark.django_db
+def test_server_timing_setting(settings, api_client):
+    settings.SERVER_TIMING = True
+    assert 'db;dur=' in api_client.get('/api/tags/')['Server-Timing']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('is_staff', (True, False))
+def test_async_server_timing_loads_session_user(is_staff):
+    pk = create_user('staff', is_staff=is_staff).pk
+
+    async def get_response(request):
+        return HttpResponse()
+
+    request = RequestFactory().get('/')
+    # Как AuthenticationMiddleware: пользователь загружается из базы
+    # при первом обращении.
+    request.user = SimpleLazyObject(lambda: CustomUser.objects.get(pk=pk))
+    response = async_to_sync(InstrumentationMiddleware(get_response))(
+        request
+    )
+    assert ('Server-Timing' in response) is is_staff
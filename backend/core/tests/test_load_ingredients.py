@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.management.commands import load_ingredients
+from core.management.commands.load_ingredients import iter_json_array
+from foodgram.models import Ingredient
+
+ITEMS = [
+    {'name': f'Ингредиент {i}, [{i}]', 'measurement_unit': 'г'}
+    for i in range(20)
+]
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Объекты и разделители разрезаются границами частей файла.
+    monkeypatch.setattr(load_ingredients, 'READ_CHUNK_SIZE', 7)
+
+
+@pytest.mark.parametrize('text', (
+    json.dumps(ITEMS, ensure_ascii=False),
+    json.dumps(ITEMS, ensure_ascii=False, indent=4),
+))
+def test_iter_json_array(text):
+    assert list(iter_json_array(StringIO(text))) == ITEMS
+
+
+def test_empty_array():
+    assert list(iter_json_array(StringIO(' \n[ ]'))) == []
+
+
+@pytest.mark.parametrize('text, message', (
+    ('', 'Неожиданный конец'),
+    ('{"name": "соль"}', 'Ожидается JSON массив'),
+    ('[{"name": "соль"},', 'Неожиданный конец'),
+    ('[{"name": ', 'Неожиданный конец'),
+    ('[{"name": "со', 'Неожиданный конец'),
+    ('[1, 2]', 'Ожидается JSON объект, позиция 1'),
+    ('[{"name": "соль"}, 2]', 'Ожидается JSON объект, позиция 19'),
+    ('[{"name": "соль"} {}]', 'Ожидается "," или "]", позиция 18'),
+    ('[{"name": соль}]', 'Ошибка в JSON файле, позиция 10'),
+    ('[{"name": "соль"},]', 'Ошибка в JSON файле, позиция 18'),
+))
+def test_invalid_json(text, message):
+    with pytest.raises(CommandError, match=message):
+        list(iter_json_array(StringIO(text)))
+
+
+def test_invalid_json_stops_reading():
+    # Ошибка в начале файла не считается обрезанным объектом:
+    # остаток файла не дочитывается.
+    file = StringIO(
+        '[{"name": соль}, '
+        + json.dumps(ITEMS * 100, ensure_ascii=False)[1:]
+    )
+    with pytest.raises(CommandError, match='позиция 10'):
+        list(iter_json_array(file))
+    assert file.tell() < 100
+
+
+@pytest.mark.django_db
+def test_invalid_csv_row(tmp_path):
+    path = tmp_path / 'ingredients.csv'
+    path.write_text('соль,г\nперец\n', encoding='utf-8')
+    with pytest.raises(CommandError, match='Строка 2'):
+        call_command('load_ingredients', str(path))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('suffix, text', (
+    ('.json', json.dumps(ITEMS, ensure_ascii=False)),
+    ('.csv', ''.join(
+        f'"{item["name"]}",{item["measurement_unit"]}\n' for item in ITEMS
+    )),
+))
+def test_command_skips_existing(tmp_path, suffix, text):
+    path = tmp_path / f'ingredients{suffix}'
+    path.write_text(text, encoding='utf-8')
+    for inserted, skipped in ((20, 0), (0, 20)):
+        out = StringIO()
+        call_command(
+            'load_ingredients', str(path), '--batch-size=6', stdout=out
+        )
+        assert f'Добавлено: {inserted}, пропущено: {skipped}' in (
+            out.getvalue()
+        )
+    assert Ingredient.objects.count() == 20
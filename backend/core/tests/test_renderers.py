@@ -0,0 +1,44 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer
+
+DATA = (
+    {'name': 'Борщ', 'amount': 10, 'tags': [1, 2], 'image': None},
+    {'text': 'строка с разделителями '},
+    {'created': datetime.datetime(2023, 7, 1, 12, 30, 15, 123456),
+     'date': datetime.date(2023, 7, 1), 'time': datetime.time(9, 5)},
+    {'price': decimal.Decimal('10.50'), 'id': uuid.UUID(int=1)},
+    {'detail': gettext_lazy('Not found.')},
+    {'big': 2 ** 70},
+    [0.1, 1.5, 123456.789, 1e15, -2.5, 0.0001],
+    {'text': 'формула 1e5 и 2e-3 в строке'},
+    [],
+    {},
+)
+
+
+@pytest.mark.parametrize('data', DATA)
+def test_same_bytes_as_json_renderer(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_float_exponent_differs_in_format_only():
+    data = [1e20, 1e-7, 1e16, -3.5e-10]
+    fast = FastJSONRenderer().render(data)
+    assert fast == b'[1e20,1e-7,1e16,-3.5e-10]'
+    assert JSONRenderer().render(data) == b'[1e+20,1e-07,1e+16,-3.5e-10]'
+    assert json.loads(fast) == data
+
+
+def test_indent_uses_json_renderer():
+    data = {'name': 'Борщ', 'amount': 1e20}
+    assert FastJSONRenderer().render(
+        data, 'application/json; indent=4'
+    ) == JSONRenderer().render(data, 'application/json; indent=4')
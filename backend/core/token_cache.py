@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.authtoken.models import Token
+
+# v2: в кэше значения полей, а не экземпляры Token.
+AUTH_TOKEN_KEY = 'auth_token:v2:{digest}'
+AUTH_TOKEN_TIMEOUT = 5 * 60
+AUTH_TOKEN_LOCAL_TIMEOUT = 5
+AUTH_TOKEN_CACHE = 'tokens'
+# Метка удаленного токена и время ее жизни: запрос, который прочитал
+# токен из базы до удаления, не может вернуть его в кэш (cache.add
+# не перезаписывает метку). Должно быть больше времени запроса.
+AUTH_TOKEN_INVALIDATED = 'invalidated'
+AUTH_TOKEN_INVALIDATED_TIMEOUT = 60
+
+
+def pack_token(token):
+    """
+    Значения полей токена и пользователя для кэша.
+    Поля пользователя, которые меняются только запросами UPDATE
+    (query_updated_fields, например recipes_count), не кэшируются.
+    :param token: Token с загруженным пользователем.
+    :return: dict.
+    """
+    user = token.user
+    return {
+        'db': token._state.db,
+        'token': (token.key, token.user_id, token.created),
+        'user': {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.name not in user.query_updated_fields
+        },
+    }
+
+
+def unpack_token(entry):
+    """
+    Новые экземпляры Token и пользователя из значений pack_token().
+    Каждый запрос получает свои объекты: изменения request.user
+    не видны другим потокам. Некэшированные поля пользователя
+    отложены и читаются из базы при обращении.
+    :param entry: dict из pack_token().
+    :return: Token.
+    """
+    user_values = entry['user']
+    user = get_user_model().from_db(
+        entry['db'], list(user_values), list(user_values.values())
+    )
+    token = Token.from_db(
+        entry['db'], ['key', 'user_id', 'created'], entry['token']
+    )
+    token.user = user
+    return token
+
+
+class TokenCache:
+    """
+    Двухуровневый кэш токенов авторизации: токен вместе с пользователем.
+    Хранятся значения полей (pack_token), объекты создаются
+    для каждого запроса заново (unpack_token).
+    Первый уровень - LRU в памяти процесса с коротким сроком жизни,
+    второй - кэш Django 'tokens' (settings.CACHES), общий для воркеров.
+    При выходе, смене пароля или отключении пользователя запись
+    в общем кэше заменяется меткой удаления на
+    AUTH_TOKEN_INVALIDATED_TIMEOUT секунд и удаляется из памяти
+    текущего процесса. Новые записи добавляются через cache.add,
+    поэтому токен, прочитанный из базы до удаления, не вернется в кэш.
+    Другие процессы перестают использовать запись не позже,
+    чем через 'local_timeout' секунд.
+    В ключах хранится хэш токена, а не сам токен.
+    """
+
+    def __init__(self, maxsize=4096, timeout=AUTH_TOKEN_TIMEOUT,
+                 local_timeout=AUTH_TOKEN_LOCAL_TIMEOUT,
+                 alias=AUTH_TOKEN_CACHE):
+        self.maxsize = maxsize
+        self.alias = alias
+        self.timeout = timeout
+        self.local_timeout = local_timeout
+        self._local = OrderedDict()
+        self._lock = Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(key):
+        return AUTH_TOKEN_KEY.format(digest=sha256(key.encode()).hexdigest())
+
+    def get_local(self, key):
+        """
+        Возвращает запись токена из памяти процесса, если срок не истек.
+        :param key: str: Ключ из make_key().
+        :return: dict из pack_token() или None.
+        """
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires, entry = entry
+            if expires < monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            self.local_hits += 1
+            return entry
+
+    def remember(self, key, entry, shared):
+        """
+        Сохраняет запись токена в памяти процесса и считает попадание
+        в общий кэш или промах.
+        :param key: str: Ключ из make_key().
+        :param entry: dict из pack_token(), None или метка удаления
+            из общего кэша.
+        :param shared: bool: Запись взята из общего кэша.
+        :return: dict или None.
+        """
+        with self._lock:
+            if entry is None or entry == AUTH_TOKEN_INVALIDATED:
+                self.misses += 1
+                return None
+            if shared:
+                self.shared_hits += 1
+            self._local[key] = (monotonic() + self.local_timeout, entry)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+        return entry
+
+    def get(self, key):
+        """
+        Возвращает токен с пользователем или None.
+        :param key: str: Токен из заголовка запроса.
+        :return: Token или None.
+        """
+        key = self.make_key(key)
+        entry = self.get_local(key)
+        if entry is None:
+            entry = self.remember(
+                key, caches[self.alias].get(key), shared=True
+            )
+        return None if entry is None else unpack_token(entry)
+
+    async def aget(self, key):
+        """
+        Асинхронный вариант 'get'.
+        """
+        key = self.make_key(key)
+        entry = self.get_local(key)
+        if entry is None:
+            entry = self.remember(
+                key, await caches[self.alias].aget(key), shared=True
+            )
+        return None if entry is None else unpack_token(entry)
+
+    def set(self, token):
+        """
+        Сохраняет токен на обоих уровнях, если в общем кэше нет
+        записи или метки удаления.
+        :param token: Token с загруженным пользователем.
+        :return: None
+        """
+        key, entry = self.make_key(token.key), pack_token(token)
+        if caches[self.alias].add(key, entry, self.timeout):
+            self.remember(key, entry, shared=False)
+
+    async def aset(self, token):
+        """
+        Асинхронный вариант 'set'.
+        """
+        key, entry = self.make_key(token.key), pack_token(token)
+        if await caches[self.alias].aadd(key, entry, self.timeout):
+            self.remember(key, entry, shared=False)
+
+    def invalidate(self, *keys):
+        """
+        Удаляет токены из обоих уровней, в общем кэше оставляет
+        метку удаления.
+        :param keys: str: Токены.
+        :return: None
+        """
+        keys = [self.make_key(key) for key in keys]
+        caches[self.alias].set_many(
+            dict.fromkeys(keys, AUTH_TOKEN_INVALIDATED),
+            AUTH_TOKEN_INVALIDATED_TIMEOUT,
+        )
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def stats(self):
+        """
+        Счетчики попаданий в кэш текущего процесса.
+        :return: dict.
+        """
+        requests = self.local_hits + self.shared_hits + self.misses
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': (
+                (self.local_hits + self.shared_hits) / requests
+                if requests else 0.0
+            ),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+
+token_cache = TokenCache()
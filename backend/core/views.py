@@ -0,0 +1,25 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.instrumentation import render_cache_metrics, route_metrics
+from core.recipe_cache import recipe_body_cache
+from core.renderers import PrometheusRenderer
+from core.token_cache import token_cache
+
+
+class MetricsView(APIView):
+    """
+    Метрики процесса в текстовом формате Prometheus:
+    гистограммы времени ответа и запросы к базе по маршрутам,
+    попадания в кэши рецептов и токенов.
+    Доступно только администраторам.
+    """
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(route_metrics.render() + render_cache_metrics({
+            'recipe_body': recipe_body_cache,
+            'auth_token': token_cache,
+        }))
@@ -0,0 +1,22 @@
+from django.db import connections
+
+from core.catalogue import get_catalogue_version
+from core.ingredient_index import ingredient_index
+from core.shopping_cart_service import register_fonts
+from foodgram.models import Ingredient, Tag
+
+
+def warm_up():
+    """
+    Заполняет кэши процесса до приема запросов: версии справочников
+    тегов и ингредиентов, индекс ингредиентов и шрифт PDF.
+    Вызывается в воркере gunicorn после загрузки приложения
+    (gunicorn.conf.py). Соединение с базой, открытое при прогреве,
+    закрывается: запросы обрабатываются в других потоках.
+    :return: None
+    """
+    for model in (Tag, Ingredient):
+        get_catalogue_version(model)
+    ingredient_index.warm_up()
+    register_fonts()
+    connections.close_all()
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdmin
+
 from .models import Cart, Favorite, Ingredient, Recipe, RecipeIngredient, Tag
 
 
@@ -16,65 +18,71 @@ class TagAdmin(admin.ModelAdmin):
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(LargeTableAdmin):
     list_display = (
         'name',
         'measurement_unit',
     )
     search_fields = ('name',)
+    ordering = ('name',)
     list_filter = ('measurement_unit',)
     empty_value_display = '-пусто-'
 
 
 class IngredientInline(admin.TabularInline):
     model = RecipeIngredient
+    autocomplete_fields = ('ingredient',)
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     list_display = (
         'name',
         'author',
-        'favorite_count',
+        'favorites_count',
+        'in_cart_count',
     )
+    list_select_related = ('author',)
+    readonly_fields = ('favorites_count', 'in_cart_count',)
+    autocomplete_fields = ('author', 'tags',)
     inlines = (IngredientInline,)
-    search_fields = ('author__username', 'name', 'tags',)
+    search_fields = ('author__username', 'name', 'tags__name',)
     list_filter = ('tags',)
     empty_value_display = '-пусто-'
 
-    def favorite_count(self, obj):
-        return obj.in_favorites.count()
-
 
 @admin.register(RecipeIngredient)
-class RecipeIngredientAdmin(admin.ModelAdmin):
+class RecipeIngredientAdmin(LargeTableAdmin):
     list_display = (
         'ingredient',
         'recipe',
         'amount',
     )
-    search_fields = ('ingredient', 'recipe',)
-    list_filter = ('amount',)
+    list_select_related = ('ingredient', 'recipe__author',)
+    autocomplete_fields = ('ingredient', 'recipe',)
+    search_fields = ('ingredient__name', 'recipe__name',)
     empty_value_display = '-пусто-'
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(LargeTableAdmin):
     list_display = (
         'user',
         'recipe',
     )
-    search_fields = ('user',)
-    list_filter = ('user',)
+    list_select_related = ('user', 'recipe__author',)
+    autocomplete_fields = ('user', 'recipe',)
+    search_fields = ('user__username', 'user__email', 'recipe__name',)
     empty_value_display = '-пусто-'
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(LargeTableAdmin):
     list_display = (
         'user',
         'recipe',
     )
-    search_fields = ('user', 'recipe',)
-    list_filter = ('user',)
+    list_select_related = ('user', 'recipe__author',)
+    autocomplete_fields = ('user', 'recipe',)
+    search_fields = ('user__username', 'user__email', 'recipe__name',)
     empty_value_display = '-пусто-'
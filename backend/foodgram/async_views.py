@@ -0,0 +1,108 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters
+from rest_framework.renderers import JSONRenderer
+
+from core.async_views import (AsyncAPIView, AsyncCatalogueView,
+                              iterate_in_thread)
+from core.filters import RecipeFilter
+from core.ingredient_index import ingredient_index
+from core.negotiation import FormatParameterNegotiation
+from core.pagination import RecipePagination
+from core.renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
+from core.shopping_cart_service import (SHOPPING_CART_EXPORTS,
+                                        get_ingredients,
+                                        render_shopping_cart)
+from foodgram.models import Ingredient, Recipe, Tag
+
+from .serializers import (IngredientSerializer, RecipeGetSerializer,
+                          TagSerializer)
+
+
+class AsyncRecipeView(AsyncAPIView):
+    """
+    Асинхронные список и страница рецепта.
+    Фильтры, сортировка и разбивка на страницы те же, что у RecipeViewSet.
+    """
+    serializer_class = RecipeGetSerializer
+    pagination_class = RecipePagination
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filterset_class = RecipeFilter
+    ordering_fields = ('created', 'favorites_count')
+
+    def get_queryset(self):
+        return Recipe.objects.with_user_flags(self.request.user)
+
+
+class AsyncIngredientView(AsyncCatalogueView):
+    """
+    Асинхронный справочник ингредиентов.
+    Поиск по параметру 'name' выполняется индексом в памяти
+    в пуле потоков, так как индекс перестраивается синхронно.
+    """
+    queryset = Ingredient.objects.all()
+    serializer_class = IngredientSerializer
+
+    async def catalogue_list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name is None:
+            return await super().catalogue_list(request, *args, **kwargs)
+        limit = request.query_params.get('limit', '')
+        return self.render(await sync_to_async(ingredient_index.search)(
+            name.strip(), int(limit) if limit.isdigit() else None
+        ))
+
+
+class AsyncTagView(AsyncCatalogueView):
+    """
+    Асинхронный справочник тегов.
+    """
+    queryset = Tag.objects.all()
+    serializer_class = TagSerializer
+
+
+class AsyncDownloadShoppingCartView(AsyncAPIView):
+    """
+    Асинхронная выгрузка списка покупок.
+    Формат выбирается как в RecipeViewSet.download_shopping_cart.
+    Ответ, как и у синхронной версии, не собирается в памяти:
+    строки txt, csv и json читаются с курсора пачками в потоке
+    синхронного кода, PDF строится reportlab там же во временный файл
+    и отдается частями.
+    """
+    renderer_classes = (
+        PDFRenderer, PlainTextRenderer, CSVRenderer, JSONRenderer,
+    )
+
+    async def download(self, request, *args, **kwargs):
+        renderer, media_type = FormatParameterNegotiation().select_renderer(
+            request, [renderer() for renderer in self.renderer_classes]
+        )
+        ingredients = get_ingredients(user_id=request.user.id).iterator()
+        if renderer.format == 'pdf':
+            pdf_file = await sync_to_async(render_shopping_cart)(ingredients)
+            response = FileResponse(
+                pdf_file,
+                as_attachment=True,
+                filename='shopping_cart.pdf',
+                content_type=renderer.media_type,
+            )
+            # Синхронный итератор файла ASGI обработчик Django
+            # прочитал бы целиком.
+            response.streaming_content = iterate_in_thread(
+                iter(partial(pdf_file.read, response.block_size), b''), 1
+            )
+            return response
+        response = StreamingHttpResponse(
+            iterate_in_thread(
+                SHOPPING_CART_EXPORTS[renderer.format](ingredients)
+            ),
+            content_type=f'{renderer.media_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_cart.{renderer.format}"'
+        )
+        return response
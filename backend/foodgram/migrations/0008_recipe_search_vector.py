@@ -0,0 +1,65 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:34
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_CONFIG = 'russian'
+
+CREATE_SEARCH_VECTOR = f'''
+CREATE OR REPLACE FUNCTION foodgram_recipe_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.text, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER foodgram_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, text, search_vector
+    ON foodgram_recipe
+    FOR EACH ROW EXECUTE FUNCTION foodgram_recipe_search_vector();
+
+UPDATE foodgram_recipe SET search_vector = NULL;
+
+CREATE INDEX recipe_search_vector_idx
+    ON foodgram_recipe USING gin (search_vector);
+'''
+
+DROP_SEARCH_VECTOR = '''
+DROP INDEX IF EXISTS recipe_search_vector_idx;
+DROP TRIGGER IF EXISTS foodgram_recipe_search_vector_trigger
+    ON foodgram_recipe;
+DROP FUNCTION IF EXISTS foodgram_recipe_search_vector();
+'''
+
+
+def create_search_vector(apps, schema_editor):
+    """
+    На PostgreSQL поисковый вектор поддерживает триггер,
+    существующие рецепты заполняются им же.
+    На других базах поиск работает без вектора.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0007_recipe_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
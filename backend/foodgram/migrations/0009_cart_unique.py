@@ -0,0 +1,76 @@
+# Generated by Django 4.2.3 on 2026-10-18 18:49
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Оставляет одну строку корзины для каждой пары (пользователь, рецепт),
+    пересчитывает счетчики рецептов и списки покупок затронутых
+    пользователей: дубли учитывались в них несколько раз.
+    """
+    Cart = apps.get_model('foodgram', 'Cart')
+    Recipe = apps.get_model('foodgram', 'Recipe')
+    RecipeIngredient = apps.get_model('foodgram', 'RecipeIngredient')
+    ShoppingCartIngredient = apps.get_model(
+        'foodgram', 'ShoppingCartIngredient')
+    duplicates = list(
+        Cart.objects.values('user_id', 'recipe_id').annotate(
+            first=Min('id'), total=Count('id'),
+        ).filter(total__gt=1).order_by()
+    )
+    if not duplicates:
+        return
+    for row in duplicates:
+        Cart.objects.filter(
+            user_id=row['user_id'], recipe_id=row['recipe_id'],
+        ).exclude(id=row['first']).delete()
+    recipe_ids = {row['recipe_id'] for row in duplicates}
+    user_ids = {row['user_id'] for row in duplicates}
+    Recipe.objects.filter(id__in=recipe_ids).update(
+        in_cart_count=Coalesce(Subquery(
+            Cart.objects.filter(
+                recipe=OuterRef('pk')
+            ).order_by().values('recipe').annotate(
+                total=Count('pk')
+            ).values('total')
+        ), 0)
+    )
+    ShoppingCartIngredient.objects.filter(user_id__in=user_ids).delete()
+    totals = RecipeIngredient.objects.filter(
+        recipe__in_cart__user__in=user_ids
+    ).values(
+        'ingredient_id', user_id=F('recipe__in_cart__user'),
+    ).annotate(total=Sum('amount')).order_by()
+    ShoppingCartIngredient.objects.bulk_create(
+        (
+            ShoppingCartIngredient(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['total'],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0008_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_cart_recipe_user'),
+        ),
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['recipe', 'user'], name='cart_recipe_user_idx'),
+        ),
+    ]
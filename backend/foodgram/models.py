@@ -1,9 +1,12 @@
 from django.core.validators import RegexValidator
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core import validators
 from django.db import models
-from django.db.models import CASCADE, UniqueConstraint
-from users.models import CustomUser
+from django.db.models import (CASCADE, Exists, F, OuterRef, UniqueConstraint,
+                              Value)
+from core.models import QueryUpdatedFieldsMixin
+from users.models import CustomUser, Subscription
 
 
 class Tag(models.Model):
@@ -61,7 +64,53 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_flags(self, user):
+        """
+        Добавляет к рецептам флаги текущего пользователя и подгружает
+        связанные объекты, чтобы сериализатор не делал запросов на каждый
+        рецепт.
+
+        :param user: Пользователь, выполняющий запрос.
+        :type user: CustomUser | AnonymousUser
+
+        :return: QuerySet с аннотациями 'is_favorited',
+            'is_in_shopping_cart' и 'is_subscribed' (подписка на автора).
+        :rtype: RecipeQuerySet
+        """
+        queryset = self.select_related('author').prefetch_related(
+            'tags', 'recipe_ingredient__ingredient',
+        )
+        if user.is_anonymous:
+            return queryset.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+                is_subscribed=Value(False),
+            )
+        return queryset.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'),
+            )),
+            is_in_shopping_cart=Exists(Cart.objects.filter(
+                user=user, recipe=OuterRef('pk'),
+            )),
+            is_subscribed=Exists(Subscription.objects.filter(
+                username=user, author=OuterRef('author'),
+            )),
+        )
+
+    def bump_versions(self):
+        """
+        Увеличивает версии рецептов одним запросом UPDATE.
+
+        :return: Количество измененных рецептов.
+        :rtype: int
+        """
+        return self.update(version=F('version') + 1)
+
+
+class Recipe(QueryUpdatedFieldsMixin, models.Model):
     author = models.ForeignKey(
         CustomUser,
         verbose_name='Автор рецепта',
@@ -109,15 +158,59 @@ class Recipe(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True,
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False,
+    )
+    in_cart_count = models.PositiveIntegerField(
+        verbose_name='В списках покупок',
+        default=0,
+        editable=False,
+    )
+    version = models.PositiveIntegerField(
+        verbose_name='Версия',
+        default=1,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        verbose_name='Поисковый вектор',
+        null=True,
+        editable=False,
+    )
+
+    query_updated_fields = ('favorites_count', 'in_cart_count', 'version')
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('-created', '-id'),
+                name='recipe_created_id_idx',
+            ),
+            models.Index(
+                fields=('-favorites_count', '-id'),
+                name='recipe_popularity_idx',
+            ),
+        )
 
     def __str__(self):
         return f'{self.author.username}, {self.name}'
 
+    def bump_version(self):
+        """
+        Увеличивает версию рецепта после изменения рецепта,
+        его тегов или ингредиентов. По версии сбрасывается
+        кэш представления рецепта.
+        Вызывается сигналами (foodgram/signals.py).
+        """
+        Recipe.objects.filter(pk=self.pk).bump_versions()
+        self.refresh_from_db(fields=('version',))
+
 
 class RecipeIngredient(models.Model):
     ingredient = models.ForeignKey(
@@ -175,6 +268,14 @@ class Cart(models.Model):
     class Meta:
         verbose_name = 'Корзина'
         verbose_name_plural = 'В корзине'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'recipe'],
+                                    name='unique_cart_recipe_user')
+        ]
+        indexes = [
+            models.Index(fields=['recipe', 'user'],
+                         name='cart_recipe_user_idx'),
+        ]
 
 
 class Favorite(models.Model):
@@ -199,3 +300,34 @@ class Favorite(models.Model):
             models.UniqueConstraint(fields=['user', 'recipe'],
                                     name='unique_favorite_recipe_user')
         ]
+
+
+class ShoppingCartIngredient(models.Model):
+    user = models.ForeignKey(
+        CustomUser,
+        verbose_name='Владелец списка',
+        related_name='shopping_cart_ingredients',
+        on_delete=CASCADE,
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        verbose_name='Ингридиент',
+        on_delete=CASCADE,
+    )
+    amount = models.IntegerField(
+        verbose_name='Количество',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Ингридиент в списке покупок'
+        verbose_name_plural = 'Ингридиенты в списках покупок'
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='unique_shopping_cart_ingredient',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} | {self.ingredient} | {self.amount}'
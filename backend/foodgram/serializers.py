@@ -1,7 +1,12 @@
+from collections import Counter
+
+from core.catalogue import get_catalogue_version
+from core.recipe_cache import recipe_body_cache
+from django.contrib.auth.models import AnonymousUser
 from django.db import transaction
-from django.shortcuts import get_object_or_404
 from drf_extra_fields.fields import Base64ImageField
 from foodgram.models import Favorite, Ingredient, Recipe, RecipeIngredient, Tag
+from foodgram.signals import recipe_amounts_changed
 from rest_framework import serializers
 from users.serializers import CustomUserSerializer
 
@@ -80,29 +85,104 @@ class RecipePostSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = '__all__'
 
-    def create_ingridients(self, ingredients, recipe):
+    def validate_ingredients(self, ingredients):
+        """
+        Проверяет, что ингредиенты не повторяются и существуют.
+        Все ингредиенты проверяются одним запросом.
+
+        :param ingredients: Список ингредиентов с 'id' и 'amount'.
+        :type ingredients: list
+
+        :return: Количество каждого ингредиента по его id.
+        :rtype: dict
+        """
+        ids = [ingredient['id'] for ingredient in ingredients]
+        duplicates = sorted(
+            pk for pk, count in Counter(ids).items() if count > 1
+        )
+        if duplicates:
+            raise serializers.ValidationError(
+                'Ингредиенты повторяются: '
+                f'{", ".join(map(str, duplicates))}.'
+            )
+        found = Ingredient.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            raise serializers.ValidationError(
+                f'Ингредиенты не найдены: {", ".join(map(str, missing))}.'
+            )
+        return {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+
+    def create_ingridients(self, amounts, recipe):
         """
         Создает объекты RecipeIngredient для данного рецепта
         с указанными ингредиентами.
 
-        :param ingredients: Список ингредиентов.
-        :type ingredients: list
+        :param amounts: Количество каждого ингредиента по его id.
+        :type amounts: dict
 
         :param recipe: Объект рецепта.
         :type recipe: Recipe
 
         :return: None
         """
-        recipe_ingredients = []
-        for ingredient in ingredients:
-            recipe_ingredients.append(
-                RecipeIngredient(
-                    recipe=recipe,
-                    ingredient=get_object_or_404(Ingredient,
-                                                 pk=ingredient.get('id')),
-                    amount=ingredient.get('amount')
-                ))
-        RecipeIngredient.objects.bulk_create(recipe_ingredients)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient_id=pk, amount=amount)
+            for pk, amount in amounts.items()
+        )
+
+    def update_ingredients(self, amounts, recipe):
+        """
+        Приводит ингредиенты рецепта к указанным:
+        удаляет лишние, изменяет количество у измененных
+        и добавляет новые. Неизмененные строки не затрагиваются.
+        Запросы выполняются без post_save и post_delete для каждой
+        строки, изменения переносятся в списки покупок сигналом
+        'recipe_amounts_changed'.
+
+        :param amounts: Количество каждого ингредиента по его id.
+        :type amounts: dict
+
+        :param recipe: Объект рецепта.
+        :type recipe: Recipe
+
+        :return: None
+        """
+        existing = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipe_ingredient.all()
+        }
+        old_amounts = {
+            pk: recipe_ingredient.amount
+            for pk, recipe_ingredient in existing.items()
+        }
+        removed = existing.keys() - amounts.keys()
+        if removed:
+            queryset = RecipeIngredient.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            )
+            queryset._raw_delete(queryset.db)
+        changed = []
+        for pk, recipe_ingredient in existing.items():
+            if pk in amounts and recipe_ingredient.amount != amounts[pk]:
+                recipe_ingredient.amount = amounts[pk]
+                changed.append(recipe_ingredient)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+        self.create_ingridients(
+            {pk: amount for pk, amount in amounts.items()
+             if pk not in existing},
+            recipe,
+        )
+        recipe_amounts_changed.send(
+            sender=RecipeIngredient,
+            recipe_id=recipe.id,
+            old_amounts=old_amounts,
+            new_amounts=amounts,
+        )
 
     @transaction.atomic
     def create(self, validated_data):
@@ -120,6 +200,7 @@ class RecipePostSerializer(serializers.ModelSerializer):
         ingredients = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(image=image, **validated_data)
         recipe.tags.set(tags)
+        # Нового рецепта нет в корзинах, списки покупок не меняются.
         self.create_ingridients(ingredients, recipe)
         return recipe
 
@@ -139,9 +220,9 @@ class RecipePostSerializer(serializers.ModelSerializer):
         :rtype: Recipe
         """
         if 'ingredients' in validated_data:
-            ingredients = validated_data.pop('ingredients')
-            instance.ingredients.clear()
-            self.create_ingridients(ingredients, instance)
+            self.update_ingredients(
+                validated_data.pop('ingredients'), instance
+            )
         if 'tags' in validated_data:
             tags = validated_data.pop('tags')
             instance.tags.set(tags)
@@ -151,19 +232,28 @@ class RecipePostSerializer(serializers.ModelSerializer):
         """
         Преобразует объект рецепта в представление.
 
+        Рецепт перечитывается с теми же связанными объектами, что
+        и в списке, иначе каждый ингредиент загружается отдельным
+        запросом, а версия в ключе кэша может быть устаревшей.
+
         :param instance: Объект рецепта.
         :type instance: Recipe
 
         :return: Представление объекта рецепта.
         :rtype: dict
         """
+        request = self.context.get('request')
+        user = request.user if request else AnonymousUser()
         return RecipeGetSerializer(
-            instance, context=self.context
+            Recipe.objects.with_user_flags(user).get(pk=instance.pk),
+            context=self.context,
         ).data
 
 
 class RecipeGetSerializer(serializers.ModelSerializer):
-    author = CustomUserSerializer(read_only=True)
+    PER_VIEWER_FIELDS = ('author', 'is_favorited', 'is_in_shopping_cart')
+
+    author = serializers.SerializerMethodField()
     tags = TagSerializer(many=True)
     ingredients = RecipeIngredientGetSerializer(
         many=True,
@@ -176,7 +266,74 @@ class RecipeGetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Recipe
-        exclude = ('created',)
+        exclude = (
+            'created', 'favorites_count', 'in_cart_count', 'version',
+            'search_vector',
+        )
+
+    def to_representation(self, recipe):
+        """
+        Возвращает представление рецепта.
+        Общая для всех пользователей часть берется из recipe_body_cache,
+        автор и флаги пользователя добавляются к ней при каждом запросе.
+
+        :param recipe: Объект рецепта.
+        :type recipe: Recipe
+
+        :return: Представление рецепта.
+        :rtype: dict
+        """
+        key = recipe_body_cache.make_key(self.get_cache_prefix(), recipe)
+        body = recipe_body_cache.get(key)
+        if body is None:
+            representation = super().to_representation(recipe)
+            recipe_body_cache.set(key, representation.copy() | dict.fromkeys(
+                self.PER_VIEWER_FIELDS
+            ))
+            return representation
+        representation = body.copy()
+        representation['author'] = self.get_author(recipe)
+        representation['is_favorited'] = self.get_is_favorited(recipe)
+        representation['is_in_shopping_cart'] = self.get_is_in_shopping_cart(
+            recipe
+        )
+        return representation
+
+    def get_cache_prefix(self):
+        """
+        Возвращает часть ключа кэша, общую для всех рецептов запроса:
+        адрес сайта (от него зависит ссылка на изображение)
+        и версии справочников тегов и ингредиентов.
+
+        :return: Префикс ключа кэша.
+        :rtype: str
+        """
+        if 'recipe_cache_prefix' not in self.context:
+            request = self.context.get('request')
+            self.context['recipe_cache_prefix'] = '{}:{}:{}'.format(
+                request.build_absolute_uri('/') if request else '',
+                get_catalogue_version(Tag),
+                get_catalogue_version(Ingredient),
+            )
+        return self.context['recipe_cache_prefix']
+
+    def get_author(self, recipe: Recipe):
+        """
+        Возвращает автора рецепта.
+        Если queryset аннотирован подпиской на автора
+        (Recipe.objects.with_user_flags), флаг передается автору,
+        чтобы не выполнять отдельный запрос.
+
+        :param recipe: Объект рецепта.
+        :type recipe: Recipe
+
+        :return: Сериализованный автор рецепта.
+        :rtype: dict
+        """
+        author = recipe.author
+        if hasattr(recipe, 'is_subscribed'):
+            author.is_subscribed = recipe.is_subscribed
+        return CustomUserSerializer(author, context=self.context).data
 
     def get_is_favorited(self, recipe: Recipe):
         """
@@ -190,6 +347,8 @@ class RecipeGetSerializer(serializers.ModelSerializer):
         добавлен ли рецепт в избранное у пользователя.
         :rtype: bool
         """
+        if hasattr(recipe, 'is_favorited'):
+            return recipe.is_favorited
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
@@ -207,6 +366,8 @@ class RecipeGetSerializer(serializers.ModelSerializer):
         добавлен ли рецепт в корзину для покупок у пользователя.
         :rtype: bool
         """
+        if hasattr(recipe, 'is_in_shopping_cart'):
+            return recipe.is_in_shopping_cart
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
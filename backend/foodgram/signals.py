@@ -0,0 +1,273 @@
+from threading import local
+
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+
+from core.catalogue import bump_catalogue_version
+from core.counters import COUNTERS, change_counter, change_counters
+from core.relations import relations_changed
+from core.shopping_cart_service import (add_recipes_to_shopping_list,
+                                        add_to_shopping_lists,
+                                        change_recipe_amounts,
+                                        remove_from_shopping_lists,
+                                        remove_recipes_from_shopping_list)
+from foodgram.models import (Cart, Favorite, Ingredient, Recipe,
+                             RecipeIngredient, Tag)
+
+# Отправляется после изменения ингредиентов рецепта запросами
+# bulk_create, bulk_update и DELETE, для которых post_save
+# и post_delete не отправляются. Аргументы: sender - RecipeIngredient,
+# recipe_id, old_amounts и new_amounts - количество ингредиентов
+# рецепта до и после изменения.
+recipe_amounts_changed = Signal()
+
+# ID рецептов, которые удаляются в текущем потоке. Корзины
+# и ингредиенты удаляются вместе с рецептом после того, как рецепт
+# убран из списков покупок (pre_delete), и не должны вычитаться второй раз.
+_deleting = local()
+
+
+def deleting_recipes():
+    if not hasattr(_deleting, 'ids'):
+        _deleting.ids = set()
+    return _deleting.ids
+
+
+def counted_fields(sender):
+    """
+    Счетчики из core.counters.COUNTERS, которые считают строки sender.
+    :param sender: Модель связанных объектов (Favorite, Cart, Recipe).
+    :return: list: (модель со счетчиком, поле счетчика,
+        внешний ключ sender).
+    """
+    return [
+        (model, counter, sender._meta.get_field(field))
+        for model, counter, related_model, field in COUNTERS
+        if related_model is sender
+    ]
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+@receiver((post_save, post_delete), sender=Tag)
+def bump_catalogue(sender, **kwargs):
+    """
+    Обновляет версию справочника после фиксации транзакции,
+    в которой изменились его записи.
+    Срабатывает и при изменениях через админку.
+    """
+    transaction.on_commit(lambda: bump_catalogue_version(sender))
+
+
+@receiver(pre_save, sender=Cart)
+@receiver(pre_save, sender=Favorite)
+@receiver(pre_save, sender=Recipe)
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_previous(sender, instance, raw=False, **kwargs):
+    """
+    Запоминает сохраненную версию изменяемой строки, чтобы в post_save
+    вычесть ее из счетчиков и списков покупок (правка в админке).
+    """
+    instance._previous = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._previous = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Cart)
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Recipe)
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Увеличивает счетчики в той же транзакции, что и добавление
+    избранного, корзины или рецепта, в том числе через админку.
+    При переносе строки на другой объект счетчик переносится.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    for model, counter, field in counted_fields(sender):
+        pk = getattr(instance, field.attname)
+        if created:
+            change_counter(model, pk, counter, 1)
+        elif previous is not None and getattr(
+                previous, field.attname) != pk:
+            change_counter(model, getattr(previous, field.attname),
+                           counter, -1)
+            change_counter(model, pk, counter, 1)
+
+
+@receiver(post_delete, sender=Cart)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Recipe)
+def count_deleted(sender, instance, **kwargs):
+    """
+    Уменьшает счетчики при удалении избранного, корзины или рецепта,
+    в том числе при каскадном удалении рецепта или пользователя.
+    """
+    for model, counter, field in counted_fields(sender):
+        change_counter(model, getattr(instance, field.attname), counter, -1)
+
+
+@receiver(relations_changed, sender=Cart)
+@receiver(relations_changed, sender=Favorite)
+def count_relations(sender, action, target_field, pk_set, **kwargs):
+    """
+    Изменяет счетчики объектов, связи с которыми добавлены или удалены
+    запросами core.relations.
+    """
+    delta = {'post_add': 1, 'post_remove': -1}[action]
+    for model, counter, field in counted_fields(sender):
+        if field.name == target_field:
+            change_counters(model, pk_set, counter, delta)
+
+
+@receiver(post_save, sender=Cart)
+def cart_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Добавляет ингредиенты рецепта в список покупок пользователя.
+    Срабатывает при добавлении рецепта в корзину через ORM и админку.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    if previous is not None:
+        if (previous.user_id, previous.recipe_id) == (
+                instance.user_id, instance.recipe_id):
+            return
+        remove_from_shopping_lists((previous.user_id,), previous.recipe_id)
+    add_to_shopping_lists((instance.user_id,), instance.recipe_id)
+
+
+@receiver(post_delete, sender=Cart)
+def cart_deleted(sender, instance, **kwargs):
+    """
+    Вычитает ингредиенты рецепта из списка покупок пользователя.
+    Срабатывает и при каскадном удалении пользователя.
+    """
+    if instance.recipe_id not in deleting_recipes():
+        remove_from_shopping_lists((instance.user_id,), instance.recipe_id)
+
+
+@receiver(relations_changed, sender=Cart)
+def cart_relations_changed(sender, action, owner_id, pk_set, **kwargs):
+    """
+    Переносит в список покупок рецепты, добавленные в корзину
+    или удаленные из нее запросами core.relations.
+    """
+    if action == 'post_add':
+        add_recipes_to_shopping_list(owner_id, pk_set)
+    elif action == 'post_remove':
+        remove_recipes_from_shopping_list(owner_id, pk_set)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved(sender, instance, raw=False, **kwargs):
+    """
+    Переносит добавленный или измененный ингредиент рецепта
+    в списки покупок, в которых есть рецепт.
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    old_amounts = {}
+    if previous is not None:
+        old_amounts = {previous.ingredient_id: previous.amount}
+        if previous.recipe_id != instance.recipe_id:
+            change_recipe_amounts(previous.recipe_id, old_amounts, {})
+            old_amounts = {}
+    change_recipe_amounts(
+        instance.recipe_id, old_amounts,
+        {instance.ingredient_id: instance.amount},
+    )
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted(sender, instance, **kwargs):
+    """
+    Вычитает удаленный ингредиент рецепта из списков покупок.
+    Срабатывает и при каскадном удалении ингредиента.
+    """
+    if instance.recipe_id not in deleting_recipes():
+        change_recipe_amounts(
+            instance.recipe_id, {instance.ingredient_id: instance.amount}, {}
+        )
+
+
+@receiver(recipe_amounts_changed, sender=RecipeIngredient)
+def recipe_amounts_saved(sender, recipe_id, old_amounts, new_amounts,
+                         **kwargs):
+    """
+    Переносит изменение ингредиентов рецепта в списки покупок
+    и увеличивает версию рецепта.
+    """
+    change_recipe_amounts(recipe_id, old_amounts, new_amounts)
+    Recipe.objects.filter(pk=recipe_id).bump_versions()
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    """
+    Убирает удаляемый рецепт из списков покупок, пока его ингредиенты
+    и корзины еще есть в базе.
+    """
+    remove_from_shopping_lists(
+        instance.in_cart.values_list('user_id', flat=True), instance.id
+    )
+    deleting_recipes().add(instance.id)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    deleting_recipes().discard(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Увеличивает версию измененного рецепта, чтобы кэш представления
+    (core.recipe_cache) не отдавал старое тело.
+    """
+    if not created and not raw:
+        instance.bump_version()
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, raw=False, **kwargs):
+    """
+    Увеличивает версию рецепта при изменении его ингредиентов через ORM,
+    RecipeIngredientAdmin, инлайн RecipeAdmin и при удалении ингредиента.
+    """
+    if raw:
+        return
+    recipe_ids = {instance.recipe_id}
+    previous = getattr(instance, '_previous', None)
+    if previous is not None:
+        recipe_ids.add(previous.recipe_id)
+    recipe_ids -= deleting_recipes()
+    if recipe_ids:
+        Recipe.objects.filter(pk__in=recipe_ids).bump_versions()
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    """
+    Увеличивает версию рецептов при изменении их тегов с любой стороны
+    связи: recipe.tags.set(...), tag.recipes.add(...), clear().
+    """
+    if action in ('post_add', 'post_remove') and not pk_set:
+        return
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.bump_version()
+    elif action == 'pre_clear':
+        instance._cleared_recipes = set(
+            instance.recipes.values_list('pk', flat=True)
+        )
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        recipe_ids = (
+            instance._cleared_recipes if action == 'post_clear' else pk_set
+        )
+        Recipe.objects.filter(pk__in=recipe_ids).bump_versions()
@@ -0,0 +1,40 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from foodgram.models import Cart, Favorite
+
+CHANGELISTS = (
+    'tag', 'ingredient', 'recipe', 'recipeingredient', 'favorite', 'cart',
+)
+
+
+@pytest.fixture
+def populate(make_recipes, make_user):
+    """
+    Добавляет рецепты, а также избранное и корзины нескольких
+    пользователей. Вызывается повторно, чтобы увеличить таблицы.
+    """
+    def populate(count):
+        readers = [make_user(f'reader-{count}-{i}') for i in range(3)]
+        for recipe in make_recipes(count, ingredients_count=5):
+            for reader in readers:
+                Favorite.objects.create(user=reader, recipe=recipe)
+                Cart.objects.create(user=reader, recipe=recipe)
+    return populate
+
+
+def changelist_queries(client, model):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f'/admin/foodgram/{model}/')
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('model', CHANGELISTS)
+def test_changelist_queries(model, staff_client, populate):
+    populate(2)
+    small = changelist_queries(staff_client, model)
+    populate(40)
+    assert changelist_queries(staff_client, model) == small
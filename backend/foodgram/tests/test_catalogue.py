@@ -0,0 +1,33 @@
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.test import APIRequestFactory
+
+from foodgram.async_views import AsyncTagView
+from foodgram.models import Tag
+
+
+def sync_get(api_client, **headers):
+    return api_client.get('/api/tags/', **headers)
+
+
+def async_get(api_client, **headers):
+    request = APIRequestFactory().get('/api/tags/', **headers)
+    return async_to_sync(AsyncTagView.as_view(action='list'))(request)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('get', (sync_get, async_get))
+def test_tags_conditional_get(get, api_client, tags,
+                              django_capture_on_commit_callbacks):
+    response = get(api_client)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response
+    etag = response['ETag']
+    assert get(api_client, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    # Изменение в ту же секунду, что и предыдущее, тоже меняет ETag.
+    with django_capture_on_commit_callbacks(execute=True):
+        Tag.objects.create(name='Новый', color='#FFFFFF', slug='new')
+    response = get(api_client, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert 'new' in response.content.decode()
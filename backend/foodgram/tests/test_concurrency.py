@@ -0,0 +1,104 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from core.counters import recount
+from foodgram.models import (Cart, Favorite, Ingredient, Recipe,
+                             RecipeIngredient)
+from users.models import CustomUser
+
+THREADS = 8
+ROUNDS = 10
+
+
+class RelationConcurrencyTest(TransactionTestCase):
+    """
+    Одновременные добавления и удаления избранного и корзины
+    одного рецепта одним пользователем.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='user', email='user@example.com', password='password',
+        )
+        self.recipes = []
+        for i in range(2):
+            recipe = Recipe.objects.create(
+                author=self.user, name=f'Рецепт {i}', text='Описание',
+                image='recipes/images/recipe.png', cooking_time=5,
+            )
+            ingredient = Ingredient.objects.create(
+                name=f'Ингредиент {i}', measurement_unit='г'
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=10
+            )
+            self.recipes.append(recipe.id)
+
+    def request(self, job):
+        method, path, data = job
+        client = APIClient()
+        client.force_authenticate(self.user)
+        try:
+            response = getattr(client, method)(path, data, format='json')
+            return method, path, response.status_code
+        finally:
+            connection.close()
+
+    def run_jobs(self, jobs):
+        with ThreadPoolExecutor(THREADS) as pool:
+            return Counter(pool.map(self.request, jobs))
+
+    def test_single_relations(self):
+        recipe = self.recipes[0]
+        jobs = [
+            (method, f'/api/recipes/{recipe}/{kind}/', None)
+            for _ in range(ROUNDS)
+            for method in ('post', 'delete')
+            for kind in ('favorite', 'shopping_cart')
+        ]
+        results = self.run_jobs(jobs)
+        for kind, model, added in (
+                ('favorite', Favorite, 200),
+                ('shopping_cart', Cart, 200)):
+            path = f'/api/recipes/{recipe}/{kind}/'
+            rows = model.objects.filter(recipe=recipe).count()
+            self.assertIn(rows, (0, 1))
+            self.assertEqual(
+                results[('post', path, added)]
+                - results[('delete', path, 204)],
+                rows,
+            )
+        self.assert_consistent()
+
+    def test_batch_relations(self):
+        jobs = [
+            (method, f'/api/recipes/{kind}/batch/', {'ids': self.recipes})
+            for _ in range(ROUNDS)
+            for method in ('post', 'delete')
+            for kind in ('favorite', 'shopping_cart')
+        ]
+        jobs += [
+            (method, f'/api/recipes/{recipe}/{kind}/', None)
+            for recipe in self.recipes
+            for method in ('post', 'delete')
+            for kind in ('favorite', 'shopping_cart')
+        ]
+        results = self.run_jobs(jobs)
+        self.assertLessEqual(
+            {status for (_, _, status) in results}, {200, 204, 400}
+        )
+        for model in (Favorite, Cart):
+            for recipe in self.recipes:
+                self.assertIn(
+                    model.objects.filter(recipe=recipe).count(), (0, 1)
+                )
+        self.assert_consistent()
+
+    def assert_consistent(self):
+        self.assertEqual(set(recount().values()), {0})
+        call_command('rebuild_shopping_lists', '--check', verbosity=0)
@@ -0,0 +1,131 @@
+import pytest
+
+from core.counters import recount
+from foodgram.models import Cart, Favorite, Recipe
+from users.models import CustomUser
+
+
+def assert_counters_exact():
+    assert set(recount().values()) == {0}
+
+
+def counters(recipe):
+    recipe.refresh_from_db()
+    return recipe.favorites_count, recipe.in_cart_count
+
+
+@pytest.mark.django_db
+def test_orm_writes(make_user, user, author, make_recipes):
+    recipe, other = make_recipes(2)
+    author.refresh_from_db()
+    assert author.recipes_count == 2
+    Favorite.objects.create(user=user, recipe=recipe)
+    cart = Cart.objects.create(user=user, recipe=recipe)
+    Cart.objects.create(user=author, recipe=recipe)
+    assert counters(recipe) == (1, 2)
+    cart.recipe = other
+    cart.save()
+    assert counters(recipe) == (1, 1)
+    assert counters(other) == (0, 1)
+    Favorite.objects.filter(user=user).delete()
+    assert counters(recipe) == (0, 1)
+    assert_counters_exact()
+
+
+@pytest.mark.django_db
+def test_cascades(make_user, user, author, make_recipes):
+    recipe, other = make_recipes(2)
+    reader = make_user('reader')
+    for recipe_ in (recipe, other):
+        Favorite.objects.create(user=reader, recipe=recipe_)
+        Cart.objects.create(user=reader, recipe=recipe_)
+        Favorite.objects.create(user=user, recipe=recipe_)
+    recipe.delete()
+    author.refresh_from_db()
+    assert author.recipes_count == 1
+    CustomUser.objects.filter(id=reader.id).delete()
+    assert counters(other) == (1, 0)
+    assert_counters_exact()
+
+
+@pytest.mark.django_db
+def test_admin_writes(staff_client, user, author, make_recipes):
+    recipe, other = make_recipes(2)
+    for model in ('favorite', 'cart'):
+        response = staff_client.post(
+            f'/admin/foodgram/{model}/add/',
+            {'user': user.id, 'recipe': recipe.id},
+        )
+        assert response.status_code == 302
+    assert counters(recipe) == (1, 1)
+    favorite = Favorite.objects.get(user=user)
+    response = staff_client.post(
+        f'/admin/foodgram/favorite/{favorite.id}/delete/', {'post': 'yes'}
+    )
+    assert response.status_code == 302
+    response = staff_client.post(
+        f'/admin/foodgram/recipe/{other.id}/delete/', {'post': 'yes'}
+    )
+    assert response.status_code == 302
+    author.refresh_from_db()
+    assert author.recipes_count == 1
+    assert counters(recipe) == (0, 1)
+    assert_counters_exact()
+
+
+@pytest.mark.django_db
+def test_api_writes(user_client, user, author, make_recipes, tags,
+                    ingredients):
+    recipe, other = make_recipes(2)
+    for path in ('favorite', 'shopping_cart'):
+        assert user_client.post(
+            f'/api/recipes/{recipe.id}/{path}/'
+        ).status_code == 200
+        assert user_client.post(
+            f'/api/recipes/{path}/batch/',
+            {'ids': [recipe.id, other.id]}, format='json',
+        ).status_code == 200
+    assert counters(recipe) == (1, 1)
+    assert counters(other) == (1, 1)
+    assert user_client.delete(
+        '/api/recipes/favorite/batch/', {'ids': [other.id]}, format='json'
+    ).status_code == 200
+    assert user_client.delete(
+        f'/api/recipes/{recipe.id}/shopping_cart/'
+    ).status_code == 204
+    assert counters(recipe) == (1, 0)
+    assert counters(other) == (0, 1)
+    user_client.force_authenticate(author)
+    assert user_client.delete(
+        f'/api/recipes/{other.id}/'
+    ).status_code == 204
+    author.refresh_from_db()
+    assert author.recipes_count == 1
+    assert not Recipe.objects.filter(id=other.id).exists()
+    assert_counters_exact()
+
+
+@pytest.mark.django_db
+def test_stale_save_keeps_counters(user_client, user, author, make_recipes):
+    recipe, = make_recipes(1)
+    stale = Recipe.objects.get(id=recipe.id)
+    stale_author = CustomUser.objects.get(id=author.id)
+    for path in ('favorite', 'shopping_cart'):
+        assert user_client.post(
+            f'/api/recipes/{recipe.id}/{path}/'
+        ).status_code == 200
+    make_recipes(1)
+    stale.name = 'Новое название'
+    stale.save()
+    stale_author.first_name = 'Автор'
+    stale_author.save()
+    assert counters(recipe) == (1, 1)
+    assert recipe.name == 'Новое название'
+    author.refresh_from_db()
+    assert author.recipes_count == 2
+    for path in ('favorite', 'shopping_cart'):
+        assert user_client.delete(
+            f'/api/recipes/{recipe.id}/{path}/'
+        ).status_code == 204
+    assert counters(recipe) == (0, 0)
+    assert_counters_exact()
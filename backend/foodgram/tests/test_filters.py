@@ -0,0 +1,117 @@
+from itertools import product
+
+import pytest
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from core.filters import RecipeFilter
+from foodgram.models import Cart, Favorite, Recipe
+
+FLAGS = (None, 0, 1)
+TAGS = ((), ('tag-0',), ('tag-0', 'tag-1'), ('unknown',),
+        ('tag-2', 'unknown'))
+AUTHORS = ('any', 'author', 'user')
+COOKING_TIMES = ((None, None), (3, None), (None, 5), (3, 5))
+
+
+@pytest.fixture
+def catalogue(make_recipes, user, author, tags):
+    """
+    Рецепты двух авторов с разными тегами и временем приготовления,
+    часть - в избранном и в корзине пользователя.
+    """
+    recipes = []
+    for i in range(12):
+        recipe, = make_recipes(
+            1,
+            author=(author, user)[i % 2],
+            tags=[tags[i % 3]] + ([tags[(i + 1) % 3]] if i % 4 == 0 else []),
+            cooking_time=i % 8 + 1,
+        )
+        recipe.starred = i % 3 == 0
+        recipe.carted = i % 2 == 0
+        if recipe.starred:
+            Favorite.objects.create(user=user, recipe=recipe)
+        if recipe.carted:
+            Cart.objects.create(user=user, recipe=recipe)
+        recipe.slugs = set(recipe.tags.values_list('slug', flat=True))
+        recipes.append(recipe)
+    return recipes
+
+
+def expected_ids(recipes, user, author, is_favorited, is_in_shopping_cart,
+                 tags, author_name, cooking_time):
+    favorited = {recipe.id for recipe in recipes if recipe.starred}
+    in_cart = {recipe.id for recipe in recipes if recipe.carted}
+    result = []
+    for recipe in recipes:
+        if is_favorited is not None and (
+                recipe.id in favorited) != bool(is_favorited):
+            continue
+        if is_in_shopping_cart is not None and (
+                recipe.id in in_cart) != bool(is_in_shopping_cart):
+            continue
+        if tags and not recipe.slugs & set(tags):
+            continue
+        if author_name != 'any' and recipe.author_id != {
+                'author': author, 'user': user}[author_name].id:
+            continue
+        low, high = cooking_time
+        if low is not None and recipe.cooking_time < low:
+            continue
+        if high is not None and recipe.cooking_time > high:
+            continue
+        result.append(recipe.id)
+    return sorted(result)
+
+
+@pytest.mark.django_db
+def test_filter_matrix(user_client, catalogue, user, author):
+    for combination in product(FLAGS, FLAGS, TAGS, AUTHORS, COOKING_TIMES):
+        is_favorited, is_in_shopping_cart, tags, author_name, (
+            low, high) = combination
+        params = {'limit': 100, 'tags': list(tags)}
+        if is_favorited is not None:
+            params['is_favorited'] = is_favorited
+        if is_in_shopping_cart is not None:
+            params['is_in_shopping_cart'] = is_in_shopping_cart
+        if author_name != 'any':
+            params['author'] = {'author': author, 'user': user}[
+                author_name].id
+        if low is not None:
+            params['cooking_time_min'] = low
+        if high is not None:
+            params['cooking_time_max'] = high
+        response = user_client.get('/api/recipes/', params)
+        assert response.status_code == 200, combination
+        ids = [recipe['id'] for recipe in response.json()['results']]
+        assert len(ids) == len(set(ids)), combination
+        assert sorted(ids) == expected_ids(
+            catalogue, user, author, is_favorited, is_in_shopping_cart,
+            tags, author_name, (low, high),
+        ), combination
+
+
+@pytest.mark.django_db
+def test_unknown_tag_returns_empty_list(user_client, catalogue):
+    response = user_client.get('/api/recipes/', {'tags': 'unknown'})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='EXPLAIN для PostgreSQL'
+)
+def test_user_flags_use_indexes(catalogue, user):
+    queryset = RecipeFilter(
+        QueryDict('is_favorited=1&is_in_shopping_cart=1&tags=tag-0'),
+        queryset=Recipe.objects.with_user_flags(user),
+    ).qs
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+    for table in ('foodgram_favorite', 'foodgram_cart'):
+        assert f'Seq Scan on {table}' not in plan, plan
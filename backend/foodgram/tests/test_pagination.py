@@ -0,0 +1,73 @@
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.test import APIRequestFactory
+
+from foodgram.async_views import AsyncRecipeView
+from foodgram.models import Recipe
+
+URL = '/api/recipes/'
+
+
+def sync_get(api_client, params):
+    response = api_client.get(URL, params)
+    return response.status_code, response.json()
+
+
+def async_get(api_client, params):
+    response = async_to_sync(AsyncRecipeView.as_view(action='list'))(
+        APIRequestFactory().get(URL, params)
+    )
+    return response.status_code, json.loads(response.content)
+
+
+@pytest.fixture(params=(sync_get, async_get))
+def get(request, api_client):
+    def get(**params):
+        return request.param(api_client, params)
+    return get
+
+
+def cursor(link):
+    return parse_qs(urlsplit(link).query)['cursor'][0]
+
+
+@pytest.mark.django_db
+def test_cursor_walks_all_recipes(get, make_recipes):
+    make_recipes(14)
+    expected = list(Recipe.objects.order_by('-created', '-id').values_list(
+        'id', flat=True
+    ))
+    status, page = get(limit=6, cursor='')
+    pages = [page]
+    while page['next']:
+        status, page = get(limit=6, cursor=cursor(page['next']))
+        pages.append(page)
+    assert [
+        recipe['id'] for page in pages for recipe in page['results']
+    ] == expected
+    status, previous = get(limit=6, cursor=cursor(pages[-1]['previous']))
+    assert previous['results'] == pages[-2]['results']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', (
+    {'ordering': '-favorites_count'},
+    {'ordering': 'created'},
+    {'search': 'Рецепт'},
+))
+def test_cursor_rejects_other_ordering(get, make_recipes, params):
+    make_recipes(2)
+    status, data = get(cursor='', **params)
+    assert status == 400
+    assert 'cursor' in data
+
+
+@pytest.mark.django_db
+def test_cursor_with_created_ordering(get, make_recipes):
+    make_recipes(2)
+    status, data = get(cursor='', ordering='-created')
+    assert status == 200
+    assert len(data['results']) == 2
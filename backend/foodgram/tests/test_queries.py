@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.recipe_cache import recipe_body_cache
+
+# Количество запросов к базе не зависит от количества рецептов
+# на странице и ингредиентов в рецепте.
+LIST_QUERIES = 5
+CURSOR_LIST_QUERIES = 4
+DETAIL_QUERIES = 4
+
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJ'
+    'AAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+)
+
+CLIENTS = ('api_client', 'user_client')
+
+
+def count_queries(client, path, **params):
+    """
+    Выполняет GET запрос с пустым кэшем представлений рецептов.
+    :return: int: Количество запросов к базе.
+    """
+    recipe_body_cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(path, params)
+    assert response.status_code == 200, response.content
+    return len(context)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('client_name', CLIENTS)
+def test_recipe_list_queries(request, client_name, make_recipes):
+    client = request.getfixturevalue(client_name)
+    make_recipes(20)
+    assert count_queries(client, '/api/recipes/', limit=2) == LIST_QUERIES
+    assert count_queries(client, '/api/recipes/', limit=20) == LIST_QUERIES
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('client_name', CLIENTS)
+def test_recipe_cursor_list_queries(request, client_name, make_recipes):
+    client = request.getfixturevalue(client_name)
+    make_recipes(20)
+    assert count_queries(
+        client, '/api/recipes/', limit=2, cursor=''
+    ) == CURSOR_LIST_QUERIES
+    assert count_queries(
+        client, '/api/recipes/', limit=20, cursor=''
+    ) == CURSOR_LIST_QUERIES
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('client_name', CLIENTS)
+def test_recipe_detail_queries(request, client_name, make_recipes):
+    client = request.getfixturevalue(client_name)
+    small, = make_recipes(1, ingredients_count=1)
+    large, = make_recipes(1, ingredients_count=40)
+    assert count_queries(
+        client, f'/api/recipes/{small.id}/'
+    ) == DETAIL_QUERIES
+    assert count_queries(
+        client, f'/api/recipes/{large.id}/'
+    ) == DETAIL_QUERIES
+
+
+@pytest.mark.django_db
+def test_cached_recipe_list_queries(user_client, make_recipes):
+    make_recipes(20)
+    user_client.get('/api/recipes/', {'limit': 20})
+    with CaptureQueriesContext(connection) as context:
+        user_client.get('/api/recipes/', {'limit': 20})
+    assert len(context) == LIST_QUERIES
+
+
+@pytest.mark.django_db
+def test_recipe_write_queries(user_client, tags, ingredients, settings,
+                              tmp_path):
+    """
+    Количество запросов при создании и изменении рецепта
+    не зависит от количества ингредиентов.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    counts = []
+    for count in (1, 30):
+        amounts = [
+            {'id': ingredient.id, 'amount': 5}
+            for ingredient in ingredients[:count]
+        ]
+        with CaptureQueriesContext(connection) as created:
+            response = user_client.post('/api/recipes/', {
+                'name': f'Рецепт {count}', 'text': 'Описание',
+                'cooking_time': 5, 'image': IMAGE, 'tags': [tags[0].id],
+                'ingredients': amounts,
+            }, format='json')
+        assert response.status_code == 201, response.content
+        assert len(response.json()['ingredients']) == count
+        amounts[0]['amount'] = 6
+        with CaptureQueriesContext(connection) as updated:
+            response = user_client.patch(
+                f'/api/recipes/{response.json()["id"]}/',
+                {'ingredients': amounts}, format='json',
+            )
+        assert response.status_code == 200, response.content
+        assert response.json()['ingredients'][0]['amount'] == 6
+        counts.append((len(created), len(updated)))
+    assert counts[0] == counts[1]
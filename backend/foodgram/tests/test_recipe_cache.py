@@ -0,0 +1,158 @@
+import pytest
+from django.core.cache import caches
+
+from core.recipe_cache import recipe_body_cache
+from foodgram.models import Ingredient, Recipe, RecipeIngredient, Tag
+
+
+def fresh_body(recipe):
+    """
+    Ожидаемые поля представления рецепта по данным в базе.
+    """
+    recipe = Recipe.objects.get(id=recipe.id)
+    return {
+        'name': recipe.name,
+        'tags': sorted(
+            (tag.id, tag.name) for tag in recipe.tags.all()
+        ),
+        'ingredients': sorted(
+            (row.ingredient_id, row.ingredient.name, row.amount)
+            for row in recipe.recipe_ingredient.select_related('ingredient')
+        ),
+    }
+
+
+def served_body(client, recipe):
+    response = client.get(f'/api/recipes/{recipe.id}/')
+    assert response.status_code == 200
+    data = response.json()
+    return {
+        'name': data['name'],
+        'tags': sorted((tag['id'], tag['name']) for tag in data['tags']),
+        'ingredients': sorted(
+            (row['id'], row['name'], row['amount'])
+            for row in data['ingredients']
+        ),
+    }
+
+
+def change_amount(recipe, **kwargs):
+    row = recipe.recipe_ingredient.first()
+    row.amount = 99
+    row.save()
+
+
+def add_ingredient(recipe, ingredients, **kwargs):
+    RecipeIngredient.objects.create(
+        recipe=recipe, ingredient=ingredients[20], amount=7
+    )
+
+
+def delete_recipe_ingredient(recipe, **kwargs):
+    recipe.recipe_ingredient.first().delete()
+
+
+def delete_ingredient(recipe, **kwargs):
+    Ingredient.objects.filter(
+        id=recipe.recipe_ingredient.first().ingredient_id
+    ).delete()
+
+
+def rename_ingredient(recipe, **kwargs):
+    ingredient = recipe.recipe_ingredient.first().ingredient
+    ingredient.name = 'Новое название'
+    ingredient.save()
+
+
+def add_tag(recipe, tags, **kwargs):
+    recipe.tags.add(tags[2])
+
+
+def remove_tag_reverse(recipe, tags, **kwargs):
+    tags[0].recipes.remove(recipe)
+
+
+def add_tag_reverse(recipe, tags, **kwargs):
+    tags[2].recipes.add(recipe)
+
+
+def clear_tag_reverse(recipe, tags, **kwargs):
+    tags[0].recipes.clear()
+
+
+def rename_tag(recipe, tags, **kwargs):
+    Tag.objects.filter(id=tags[0].id).update(name='Новый тег')
+    tags[0].refresh_from_db()
+    tags[0].save()
+
+
+def rename_recipe(recipe, **kwargs):
+    recipe.name = 'Новое название рецепта'
+    recipe.save()
+
+
+def stale_rename_recipe(recipe, user_client, **kwargs):
+    """
+    Сохранение экземпляра, загруженного до изменения ингредиентов,
+    после которого тело новой версии уже попало в кэш.
+    """
+    stale = Recipe.objects.get(id=recipe.id)
+    change_amount(recipe)
+    served_body(user_client, recipe)
+    stale.name = 'Новое название рецепта'
+    stale.save()
+
+
+def admin_change_amount(recipe, staff_client, **kwargs):
+    row = recipe.recipe_ingredient.first()
+    response = staff_client.post(
+        f'/admin/foodgram/recipeingredient/{row.id}/change/',
+        {'ingredient': row.ingredient_id, 'recipe': recipe.id,
+         'amount': 99},
+    )
+    assert response.status_code == 302
+
+
+def api_update(recipe, ingredients, tags, api_client, **kwargs):
+    api_client.force_authenticate(recipe.author)
+    response = api_client.patch(f'/api/recipes/{recipe.id}/', {
+        'ingredients': [{'id': ingredients[30].id, 'amount': 3}],
+        'tags': [tags[1].id],
+    }, format='json')
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('change', (
+    change_amount, add_ingredient, delete_recipe_ingredient,
+    delete_ingredient, rename_ingredient, add_tag, remove_tag_reverse,
+    add_tag_reverse, clear_tag_reverse, rename_tag, rename_recipe,
+    stale_rename_recipe, admin_change_amount, api_update,
+))
+def test_stale_body_is_never_served(
+        change, user_client, api_client, staff_client, make_recipes, tags,
+        ingredients, django_capture_on_commit_callbacks):
+    recipe, other = make_recipes(2)
+    for _ in range(2):
+        assert served_body(user_client, recipe) == fresh_body(recipe)
+    with django_capture_on_commit_callbacks(execute=True):
+        change(recipe=recipe, tags=tags, ingredients=ingredients,
+               staff_client=staff_client, api_client=api_client,
+               user_client=user_client)
+    assert served_body(user_client, recipe) == fresh_body(recipe)
+    assert served_body(user_client, other) == fresh_body(other)
+    # Тот же результат после обращения к общему кэшу
+    # из другого процесса (пустой LRU).
+    recipe_body_cache.clear()
+    assert served_body(user_client, recipe) == fresh_body(recipe)
+
+
+@pytest.mark.django_db
+def test_body_is_cached(user_client, make_recipes):
+    recipe, = make_recipes(1)
+    served_body(user_client, recipe)
+    served_body(user_client, recipe)
+    assert recipe_body_cache.local_hits >= 1
+    key, = recipe_body_cache._local
+    assert caches['recipes'].get(key) is not None
+    assert caches['default'].get(key) is None
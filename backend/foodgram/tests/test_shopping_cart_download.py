@@ -0,0 +1,163 @@
+import csv
+import json
+import tracemalloc
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from foodgram.async_views import AsyncDownloadShoppingCartView
+from foodgram.models import Ingredient, ShoppingCartIngredient
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+def fill_shopping_list(user, lines):
+    """
+    Заполняет список покупок пользователя 'lines' строками
+    напрямую, без рецептов и корзины.
+    """
+    ShoppingCartIngredient.objects.filter(user=user).delete()
+    start = Ingredient.objects.count()
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(name=f'Продукт {start + i:06d}', measurement_unit='г')
+        for i in range(lines)
+    )
+    ShoppingCartIngredient.objects.bulk_create(
+        ShoppingCartIngredient(user=user, ingredient=ingredient, amount=i + 1)
+        for i, ingredient in enumerate(ingredients)
+    )
+
+
+def sync_download(user_client, user, **kwargs):
+    response = user_client.get(URL, kwargs.pop('params', {}), **kwargs)
+    content = (
+        b''.join(response.streaming_content) if response.streaming
+        else response.content
+    )
+    return response, content
+
+
+def async_request(user, params, **kwargs):
+    token, _ = Token.objects.get_or_create(user=user)
+    return APIRequestFactory().get(
+        URL, params, HTTP_AUTHORIZATION=f'Token {token.key}', **kwargs
+    )
+
+
+async def async_response(request, consume):
+    response = await AsyncDownloadShoppingCartView.as_view(
+        action='download'
+    )(request)
+    content = b''
+    if response.streaming:
+        async for part in response.streaming_content:
+            content = consume(content, part)
+    else:
+        content = response.content
+    return response, content
+
+
+def async_download(user_client, user, **kwargs):
+    request = async_request(user, kwargs.pop('params', {}), **kwargs)
+    return async_to_sync(async_response)(
+        request, lambda content, part: content + part
+    )
+
+
+@pytest.fixture(params=(sync_download, async_download))
+def download(request, user_client, user):
+    def download(**kwargs):
+        return request.param(user_client, user, **kwargs)
+    return download
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('accept', (None, 'application/json', 'text/csv'))
+def test_pdf_is_default_whatever_accept_says(download, user, accept):
+    fill_shopping_list(user, 3)
+    headers = {'HTTP_ACCEPT': accept} if accept else {}
+    response, content = download(**headers)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/pdf'
+    assert content.startswith(b'%PDF')
+
+
+@pytest.mark.django_db
+def test_formats(download, user):
+    fill_shopping_list(user, 3)
+    expected = [
+        {'name': f'Продукт {i:06d}', 'amount': i + 1,
+         'measurement_unit': 'г'}
+        for i in range(3)
+    ]
+    response, content = download(params={'format': 'json'},
+                                 HTTP_ACCEPT='application/pdf')
+    assert response['Content-Type'].startswith('application/json')
+    assert json.loads(content) == expected
+    response, content = download(params={'format': 'csv'})
+    rows = list(csv.DictReader(StringIO(content.decode())))
+    assert [
+        {**row, 'amount': int(row['amount'])} for row in rows
+    ] == expected
+    response, content = download(params={'format': 'txt'})
+    assert content.decode().splitlines()[1:] == [
+        f'{i + 1}. Продукт {i:06d} - {i + 1}, г' for i in range(3)
+    ]
+    response, content = download(params={'format': 'xml'})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_empty_json(download, user):
+    response, content = download(params={'format': 'json'})
+    assert json.loads(content) == []
+
+
+def sync_stream(user_client, user, export_format):
+    response = user_client.get(URL, {'format': export_format})
+    assert response.streaming
+    for _ in response.streaming_content:
+        pass
+
+
+def async_stream(user_client, user, export_format):
+    request = async_request(user, {'format': export_format})
+    response, _ = async_to_sync(async_response)(
+        request, lambda content, part: content
+    )
+    assert response.streaming
+
+
+def streaming_peak(stream, *args):
+    """
+    Пиковая память (байт) на запрос и чтение потокового ответа.
+    """
+    tracemalloc.start()
+    try:
+        stream(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('stream', (sync_stream, async_stream))
+@pytest.mark.parametrize('export_format', ('txt', 'csv', 'json'))
+def test_streaming_peak_memory_is_flat(user_client, user, stream,
+                                       export_format):
+    # Прогрев: импорты, шрифты и кэши запросов не должны
+    # попасть в первый замер.
+    fill_shopping_list(user, 10)
+    streaming_peak(stream, user_client, user, export_format)
+    # Не меньше двух частей iterator() по 2000 строк: пока читается
+    # следующая часть, предыдущая еще в памяти.
+    fill_shopping_list(user, 4000)
+    small = streaming_peak(stream, user_client, user, export_format)
+    fill_shopping_list(user, 16000)
+    large = streaming_peak(stream, user_client, user, export_format)
+    # Ответ в 4 раза больше, память почти не растет: строки
+    # читаются с курсора частями и сразу отдаются.
+    assert large < small * 1.5, (small, large)
@@ -0,0 +1,178 @@
+import pytest
+from django.core.management import call_command
+
+from core.shopping_cart_service import get_ingredients
+from foodgram.models import Cart, Ingredient, Recipe, RecipeIngredient
+from users.models import CustomUser
+
+
+def shopping_list(user):
+    return {
+        item['name']: item['amount'] for item in get_ingredients(user.id)
+    }
+
+
+def assert_consistent():
+    call_command('rebuild_shopping_lists', '--check', verbosity=0)
+
+
+@pytest.fixture
+def recipes(make_recipes):
+    return make_recipes(2)
+
+
+@pytest.mark.django_db
+def test_cart_create_and_delete(user, recipes):
+    cart = Cart.objects.create(user=user, recipe=recipes[0])
+    Cart.objects.create(user=user, recipe=recipes[1])
+    assert shopping_list(user) == {
+        'Ингредиент 000': 20, 'Ингредиент 001': 22, 'Ингредиент 002': 24,
+    }
+    cart.delete()
+    assert shopping_list(user) == {
+        'Ингредиент 000': 10, 'Ингредиент 001': 11, 'Ингредиент 002': 12,
+    }
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_cart_edit_moves_recipe(user, author, make_recipes):
+    small, = make_recipes(1, ingredients_count=1)
+    large, = make_recipes(1, ingredients_count=3)
+    cart = Cart.objects.create(user=user, recipe=small)
+    cart.recipe = large
+    cart.save()
+    cart.user = author
+    cart.save()
+    assert shopping_list(user) == {}
+    assert len(shopping_list(author)) == 3
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_recipe_ingredient_changes(user, recipes, ingredients):
+    recipe = recipes[0]
+    Cart.objects.create(user=user, recipe=recipe)
+    row = RecipeIngredient.objects.get(
+        recipe=recipe, ingredient=ingredients[0]
+    )
+    row.amount = 99
+    row.save()
+    RecipeIngredient.objects.create(
+        recipe=recipe, ingredient=ingredients[10], amount=5
+    )
+    RecipeIngredient.objects.get(
+        recipe=recipe, ingredient=ingredients[1]
+    ).delete()
+    row.recipe = recipes[1]
+    row.ingredient = ingredients[11]
+    row.save()
+    assert shopping_list(user) == {
+        'Ингредиент 002': 12, 'Ингредиент 010': 5,
+    }
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_recipe_delete(user, author, recipes):
+    for recipe in recipes:
+        Cart.objects.create(user=user, recipe=recipe)
+        Cart.objects.create(user=author, recipe=recipe)
+    recipes[0].delete()
+    expected = {
+        'Ингредиент 000': 10, 'Ингредиент 001': 11, 'Ингредиент 002': 12,
+    }
+    assert shopping_list(user) == expected
+    assert shopping_list(author) == expected
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_admin_recipe_delete(staff_client, user, recipes):
+    Cart.objects.create(user=user, recipe=recipes[0])
+    response = staff_client.post(
+        f'/admin/foodgram/recipe/{recipes[0].id}/delete/', {'post': 'yes'}
+    )
+    assert response.status_code == 302
+    assert not Recipe.objects.filter(id=recipes[0].id).exists()
+    assert shopping_list(user) == {}
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_admin_recipe_ingredient_edit(staff_client, user, recipes,
+                                      ingredients):
+    Cart.objects.create(user=user, recipe=recipes[0])
+    row = RecipeIngredient.objects.get(
+        recipe=recipes[0], ingredient=ingredients[0]
+    )
+    response = staff_client.post(
+        f'/admin/foodgram/recipeingredient/{row.id}/change/',
+        {'ingredient': ingredients[0].id, 'recipe': recipes[0].id,
+         'amount': 99},
+    )
+    assert response.status_code == 302
+    assert shopping_list(user)['Ингредиент 000'] == 99
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_admin_cart_add(staff_client, user, recipes):
+    response = staff_client.post(
+        '/admin/foodgram/cart/add/',
+        {'user': user.id, 'recipe': recipes[0].id},
+    )
+    assert response.status_code == 302
+    assert len(shopping_list(user)) == 3
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_cascades(make_user, user, author, recipes, ingredients):
+    other = make_user('other')
+    for recipe in recipes:
+        Cart.objects.create(user=user, recipe=recipe)
+        Cart.objects.create(user=other, recipe=recipe)
+    Ingredient.objects.filter(id=ingredients[0].id).delete()
+    assert 'Ингредиент 000' not in shopping_list(user)
+    CustomUser.objects.filter(id=other.id).delete()
+    assert_consistent()
+    CustomUser.objects.filter(id=author.id).delete()
+    assert shopping_list(user) == {}
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_api_writes(user_client, user, recipes, ingredients, tags):
+    recipe = recipes[0]
+    assert user_client.post(
+        f'/api/recipes/{recipe.id}/shopping_cart/'
+    ).status_code == 200
+    assert user_client.post(
+        '/api/recipes/shopping_cart/batch/',
+        {'ids': [recipe.id, recipes[1].id]}, format='json',
+    ).status_code == 200
+    assert shopping_list(user)['Ингредиент 000'] == 20
+    user_client.force_authenticate(recipe.author)
+    response = user_client.patch(f'/api/recipes/{recipe.id}/', {
+        'ingredients': [
+            {'id': ingredients[0].id, 'amount': 1},
+            {'id': ingredients[5].id, 'amount': 7},
+        ],
+        'tags': [tags[0].id],
+    }, format='json')
+    assert response.status_code == 200, response.content
+    assert shopping_list(user) == {
+        'Ингредиент 000': 11, 'Ингредиент 001': 11, 'Ингредиент 002': 12,
+        'Ингредиент 005': 7,
+    }
+    user_client.force_authenticate(user)
+    assert user_client.delete(
+        '/api/recipes/shopping_cart/batch/',
+        {'ids': [recipes[1].id]}, format='json',
+    ).status_code == 200
+    assert user_client.delete(
+        f'/api/recipes/{recipe.id}/shopping_cart/'
+    ).status_code == 204
+    assert shopping_list(user) == {}
+    assert_consistent()
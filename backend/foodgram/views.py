@@ -1,22 +1,25 @@
-import os
-
-from django.conf import settings
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-from rest_framework import permissions, status
+from rest_framework import filters, permissions, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from core.filters import IngredientNameFilter
-from core.pagination import LimitPagePagination
+from core.filters import RecipeFilter
+from core.ingredient_index import ingredient_index
+from core.mixins import BatchActionMixin, CatalogueConditionalMixin
+from core.negotiation import FormatParameterNegotiation
+from core.pagination import RecipePagination
 from core.permissions import IsAdminOrAuthorOrReadOnly, IsAdminOrReadOnly
-from core.shopping_cart_service import (draw_shopping_cart,
-                                        generate_final_list, get_ingredients)
+from core.relations import (add_recipe_relation, add_relations,
+                            remove_recipe_relation, remove_relations)
+from core.renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
+from core.shopping_cart_service import (SHOPPING_CART_EXPORTS,
+                                        get_ingredients,
+                                        render_shopping_cart)
 from foodgram.models import Cart, Favorite, Ingredient, Recipe, Tag
 
 from .serializers import (FavoriteSerializer, IngredientSerializer,
@@ -24,7 +27,7 @@ from .serializers import (FavoriteSerializer, IngredientSerializer,
                           RecipeSerializer, TagSerializer)
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(BatchActionMixin, ModelViewSet):
     """
     Получение списка всех рецептов, добавлеиние, редактирование и удаление.
     - `permission_classes` определяет классы разрешений,
@@ -33,11 +36,21 @@ class RecipeViewSet(ModelViewSet):
         администраторам полный доступ,
         гостям ReadOnly,
         авторам права на добавление, редактирование, удаление своего рецепта.
-    - `pagination_class` определяет используемый стиль разбивки на страницы.
+    - `filterset_class` фильтрует рецепты по избранному, списку покупок,
+        тегам, автору и времени приготовления.
+    - `ordering_fields` позволяет сортировать по дате и популярности
+        (`ordering=-favorites_count`).
+    - `pagination_class` определяет используемый стиль разбивки на страницы:
+        по номеру страницы или, с параметром `cursor`, по курсору
+        (только при сортировке по дате, без `ordering` и `search`).
+    - `favorite/batch` и `shopping_cart/batch` добавляют (POST)
+        и удаляют (DELETE) несколько рецептов одним запросом.
     """
     permission_classes = (IsAdminOrAuthorOrReadOnly,)
-    pagination_class = LimitPagePagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = RecipePagination
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filterset_class = RecipeFilter
+    ordering_fields = ('created', 'favorites_count')
 
     def perform_create(self, serializer):
         """
@@ -58,22 +71,38 @@ class RecipeViewSet(ModelViewSet):
 
     def get_queryset(self):
         """
-        Возвращает queryset, основываясь на параметрах запроса.
+        Возвращает queryset с флагами текущего пользователя.
+        Флаги вычисляются подзапросами, теги и ингредиенты
+        подгружаются заранее.
         :return: Queryset.
         """
-        is_favorited = self.request.query_params.get('is_favorited')
-        if is_favorited:
-            return Recipe.objects.filter(in_favorites__user=self.request.user)
-        is_in_shopping_cart = self.request.query_params.get(
-            'is_in_shopping_cart')
-        if is_in_shopping_cart:
-            return Recipe.objects.filter(in_cart__user=self.request.user)
-        tags = self.request.query_params.getlist('tags')
-        if tags:
-            return Recipe.objects.filter(tags__slug__in=tags)
-        return Recipe.objects.all()
+        return Recipe.objects.with_user_flags(self.request.user)
+
+    def get_recipe_id(self):
+        """
+        Возвращает pk рецепта из адреса запроса.
+        :return: int.
+        """
+        try:
+            return Recipe._meta.pk.to_python(self.kwargs['pk'])
+        except ValidationError:
+            raise Http404
+
+    def relation_error(self, recipe_id, message):
+        """
+        Ответ на повторное добавление или удаление: 404, если рецепта нет,
+        иначе 400 с сообщением.
+        Проверка выполняется только в этом случае, успешные запросы
+        обходятся одним запросом на изменение связи.
+        """
+        if not Recipe.objects.filter(id=recipe_id).exists():
+            raise Http404
+        return Response(
+            {'errors': message}, status=status.HTTP_400_BAD_REQUEST
+        )
 
     @action(detail=True, methods=('post',))
+    @transaction.atomic
     def favorite(self, request, pk=None):
         """
         Добавляет рецепт в список избранного пользователя.
@@ -81,41 +110,31 @@ class RecipeViewSet(ModelViewSet):
         :param pk: pk рецепта, переданный в запросе.
         :return: Response.
         """
-        recipe = get_object_or_404(Recipe, id=pk)
-        favorite = Favorite.objects.filter(
-            user=request.user,
-            recipe=recipe,
-        )
-        if favorite.exists():
-            return Response({
-                'errors': 'Рецепт уже добавлен в избранное.'
-            },
-                status=status.HTTP_400_BAD_REQUEST,
+        recipe_id = self.get_recipe_id()
+        if not add_recipe_relation(Favorite, request.user.id, recipe_id):
+            return self.relation_error(
+                recipe_id, 'Рецепт уже добавлен в избранное.'
             )
-        Favorite.objects.create(user=request.user, recipe=recipe)
         return Response(FavoriteSerializer(
-            recipe,
+            Recipe.objects.get(id=recipe_id),
             context={'request': request}
         ).data)
 
     @favorite.mapping.delete
+    @transaction.atomic
     def favorite_delete(self, request, pk=None):
         """
         Удаляет рецепт из списка избранного.
         """
-        recipe = get_object_or_404(Recipe, id=pk)
-        favorite = Favorite.objects.filter(
-            user=request.user,
-            recipe=recipe,
-        )
-        if favorite.exists():
-            favorite.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(
-            {'errors': 'Рецепт не находится в избранном.'},
-            status=status.HTTP_400_BAD_REQUEST)
+        recipe_id = self.get_recipe_id()
+        if not remove_recipe_relation(Favorite, request.user.id, recipe_id):
+            return self.relation_error(
+                recipe_id, 'Рецепт не находится в избранном.'
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=('post',), )
+    @transaction.atomic
     def shopping_cart(self, request, pk=None):
         """
         Добваляет рецепт в список покупок.
@@ -123,63 +142,135 @@ class RecipeViewSet(ModelViewSet):
         :param pk: pk рецепта, переданный в запросе.
         :return: Response.
         """
-        recipe = get_object_or_404(Recipe, id=pk)
-        shopping_cart = Cart.objects.filter(
-            user=request.user,
-            recipe=recipe,
-        )
-        if shopping_cart.exists():
-            return Response(
-                {'errors': 'Рецепт уже в списке покупок.'},
-                status=status.HTTP_400_BAD_REQUEST
+        recipe_id = self.get_recipe_id()
+        if not add_recipe_relation(Cart, request.user.id, recipe_id):
+            return self.relation_error(
+                recipe_id, 'Рецепт уже в списке покупок.'
             )
-        Cart.objects.create(user=request.user, recipe=recipe)
         return Response(RecipeSerializer(
-            recipe,
+            Recipe.objects.get(id=recipe_id),
             context={'request': request}
         ).data)
 
     @shopping_cart.mapping.delete
+    @transaction.atomic
     def shopping_cart_delete(self, request, pk=None):
         """
         Удаляет рецепт из списока покупок.
         """
-        recipe = get_object_or_404(Recipe, id=pk)
-        shopping_cart = Cart.objects.filter(
-            user=request.user,
-            recipe=recipe,
+        recipe_id = self.get_recipe_id()
+        if not remove_recipe_relation(Cart, request.user.id, recipe_id):
+            return self.relation_error(
+                recipe_id, 'Рецепт не находится в списке покупок'
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def recipe_batch_response(self, ids, done, message):
+        """
+        Ответ пакетного действия: для невыполненных ID сообщение
+        'message' или 'Рецепт не найден.', если рецепта нет.
+        """
+        failed = [pk for pk in ids if pk not in done]
+        existing = set(Recipe.objects.filter(
+            id__in=failed
+        ).values_list('id', flat=True)) if failed else set()
+        return self.batch_response(
+            ids, done,
+            lambda pk: message if pk in existing else 'Рецепт не найден.'
         )
-        if shopping_cart.exists():
-            shopping_cart.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        data = {'errors': 'Рецепт не находится в списке покупок'}
-        return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False)
+    @action(detail=False, methods=('post',), url_path='favorite/batch')
+    @transaction.atomic
+    def favorite_batch(self, request):
+        """
+        Добавляет несколько рецептов в избранное
+        одним запросом INSERT.
+        :param request: HTTP request object, {"ids": [...]}.
+        :return: Response с результатом для каждого рецепта.
+        """
+        ids = self.get_batch_ids()
+        added = add_relations(Favorite, 'user', request.user.id,
+                              'recipe', ids)
+        return self.recipe_batch_response(
+            ids, added, 'Рецепт уже добавлен в избранное.'
+        )
+
+    @favorite_batch.mapping.delete
+    @transaction.atomic
+    def favorite_batch_delete(self, request):
+        """
+        Удаляет несколько рецептов из избранного.
+        """
+        ids = self.get_batch_ids()
+        removed = remove_relations(Favorite, 'user', request.user.id,
+                                   'recipe', ids)
+        return self.recipe_batch_response(
+            ids, removed, 'Рецепт не находится в избранном.'
+        )
+
+    @action(detail=False, methods=('post',), url_path='shopping_cart/batch')
+    @transaction.atomic
+    def shopping_cart_batch(self, request):
+        """
+        Добавляет несколько рецептов в список покупок
+        одним запросом INSERT и одним обновлением списка покупок.
+        :param request: HTTP request object, {"ids": [...]}.
+        :return: Response с результатом для каждого рецепта.
+        """
+        ids = self.get_batch_ids()
+        added = add_relations(Cart, 'user', request.user.id, 'recipe', ids)
+        return self.recipe_batch_response(
+            ids, added, 'Рецепт уже в списке покупок.'
+        )
+
+    @shopping_cart_batch.mapping.delete
+    @transaction.atomic
+    def shopping_cart_batch_delete(self, request):
+        """
+        Удаляет несколько рецептов из списка покупок.
+        """
+        ids = self.get_batch_ids()
+        removed = remove_relations(Cart, 'user', request.user.id,
+                                   'recipe', ids)
+        return self.recipe_batch_response(
+            ids, removed, 'Рецепт не находится в списке покупок'
+        )
+
+    @action(
+        detail=False,
+        renderer_classes=(
+            PDFRenderer, PlainTextRenderer, CSVRenderer, JSONRenderer,
+        ),
+        content_negotiation_class=FormatParameterNegotiation,
+    )
     def download_shopping_cart(self, request):
         """
+        Отдает список покупок частями, не собирая ответ в памяти.
+        Формат выбирается только параметром 'format': pdf (по умолчанию,
+        независимо от заголовка Accept), txt, csv или json.
         :param request: HTTP request object.
-        :return: HttpResponse.
+        :return: FileResponse или StreamingHttpResponse.
         """
-        ingredients = get_ingredients(user_id=request.user.id)
-        shopping_cart = generate_final_list(ingredients)
-        font_path = os.path.join(
-            settings.BASE_DIR,
-            'core/HelveticaBlack.ttf'
+        ingredients = get_ingredients(user_id=request.user.id).iterator()
+        renderer = request.accepted_renderer
+        if renderer.format == 'pdf':
+            return FileResponse(
+                render_shopping_cart(ingredients),
+                as_attachment=True,
+                filename='shopping_cart.pdf',
+                content_type=renderer.media_type,
+            )
+        response = StreamingHttpResponse(
+            SHOPPING_CART_EXPORTS[renderer.format](ingredients),
+            content_type=f'{renderer.media_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_cart.{renderer.format}"'
         )
-        pdfmetrics.registerFont(TTFont('HelveticaBlack', font_path, 'UTF-8'))
-        response = HttpResponse(content_type='application/pdf')
-        response[
-            'Content-Disposition'
-        ] = 'attachment; filename="shopping_cart.pdf"'
-        page = canvas.Canvas(response)
-        draw_shopping_cart(page, shopping_cart)
-        page.showPage()
-        page.save()
         return response
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogueConditionalMixin, ReadOnlyModelViewSet):
     """
     - `queryset` представляет набор объектов ингредиентов,
         к которым необходимо получить доступ.
@@ -187,19 +278,34 @@ class IngredientViewSet(ReadOnlyModelViewSet):
         необходимые для доступа к представлению.
         В этом случае класс `IsAdminOrReadOnly` предоставляет администраторам
         полный доступ, в то время как другие имеют доступ только для чтения.
-    - `filter_backends`: Настроенный серверный модуль фильтра
-        для фильтрации ингредиентов по названию.
-    - `search_fields`: Поле `name' используется для поиска названия ингредиента
-        начинающегося с указанного значения.
+    - Параметр запроса `name` ищет ингредиенты, название которых
+        начинается с указанного значения, `limit` ограничивает
+        количество результатов. Поиск выполняется по индексу в памяти
+        без запросов к базе.
+    - `CatalogueConditionalMixin` отвечает 304 на повторный запрос
+        списка, если справочник не менялся.
     """
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (IngredientNameFilter,)
-    search_fields = ('^name',)
+
+    def catalogue_list(self, request, *args, **kwargs):
+        """
+        Возвращает все ингредиенты или ингредиенты,
+        найденные по началу названия.
+        :param request: HTTP request object.
+        :return: Response.
+        """
+        name = request.query_params.get('name')
+        if name is None:
+            return super().catalogue_list(request, *args, **kwargs)
+        limit = request.query_params.get('limit', '')
+        return Response(ingredient_index.search(
+            name.strip(), int(limit) if limit.isdigit() else None
+        ))
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(CatalogueConditionalMixin, ReadOnlyModelViewSet):
     """
     - `queryset` представляет набор объектов тегов,
         к которым необходимо получить доступ.
@@ -207,7 +313,8 @@ class TagViewSet(ReadOnlyModelViewSet):
         необходимые для доступа к представлению.
         В этом случае класс `IsAdminOrReadOnly` предоставляет администраторам
         полный доступ, в то время как другие имеют доступ только для чтения.
-    - `pagination_class` определяет используемый стиль разбивки на страницы.
+    - `CatalogueConditionalMixin` отвечает 304 на повторный запрос
+        списка, если справочник не менялся.
     """
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
@@ -19,6 +19,17 @@ DEBUG = os.getenv('DEBUG', '') == 'True'
 
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split()
 
+# Асинхронные представления для чтения (api/urls.py),
+# включаются при запуске через ASGI (foodgram_backend.asgi).
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '') == 'True'
+
+# Запросы к базе дольше этого времени (мс) пишутся в лог 'foodgram.db'.
+SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 200))
+
+# Заголовок Server-Timing (время и количество запросов к базе)
+# во всех ответах. Без настройки заголовок получает только персонал.
+SERVER_TIMING = os.getenv('SERVER_TIMING', '') == 'True'
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -41,6 +52,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'users.CustomUser'
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,17 +93,91 @@ DJOSER = {
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Соединения с базой:
+# - CONN_MAX_AGE - сколько секунд соединение переиспользуется между
+#   запросами (0 - новое соединение на каждый запрос, по умолчанию
+#   при ASYNC_VIEWS: под ASGI Django не закрывает соединения потоков),
+#   перед повторным использованием соединение проверяется,
+#   если CONN_HEALTH_CHECKS=True;
+# - DB_POOL=True - пул соединений в процессе (core.db_pool, нужен
+#   psycopg 3 с psycopg_pool), размер задают DB_POOL_MIN_SIZE
+#   и DB_POOL_MAX_SIZE, ожидание свободного соединения - DB_POOL_TIMEOUT;
+# - DB_PGBOUNCER=True - работа через PgBouncer в режиме transaction:
+#   без серверных курсоров, которые не переживают конец транзакции.
+
+DB_POOL = os.getenv('DB_POOL', '') == 'True'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.db_pool' if DB_POOL else 'django.db.backends.postgresql'
+        ),
         'NAME': os.getenv('POSTGRES_DB', 'django'),
         'USER': os.getenv('POSTGRES_USER', 'django'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'password'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': (
+            0 if DB_POOL
+            else int(os.getenv('CONN_MAX_AGE', 0 if ASYNC_VIEWS else 60))
+        ),
+        'CONN_HEALTH_CHECKS': os.getenv('CONN_HEALTH_CHECKS', 'True') == 'True',
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_PGBOUNCER', '') == 'True',
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            },
+        } if DB_POOL else {},
     }
 }
 
+# Cache
+# Версии справочников и кэши данных должны быть общими для всех воркеров,
+# поэтому по умолчанию используется файловый кэш. Для нескольких серверов
+# укажите общий кэш, например Redis или Memcached.
+# Представления рецептов (их много) хранятся в отдельном кэше 'recipes':
+# при переполнении файловый кэш удаляет случайные записи и не должен
+# удалять версии справочников из 'default'. Токены авторизации с
+# пользователями хранятся в кэше 'tokens'. Файловый кэш просматривает
+# каталог при каждой записи, поэтому для большого MAX_ENTRIES укажите
+# RECIPE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache.
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', os.path.join(BASE_DIR, '.cache')
+        ),
+    },
+    'recipes': {
+        'BACKEND': os.getenv(
+            'RECIPE_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'RECIPE_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'recipes')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RECIPE_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    'tokens': {
+        'BACKEND': os.getenv(
+            'TOKEN_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'TOKEN_CACHE_LOCATION', os.path.join(BASE_DIR, '.cache', 'tokens')
+        ),
+    },
+}
+
 CSRF_TRUSTED_ORIGINS = [
     'http://127.0.0.1:8080',
     'http://backend:8080',
@@ -101,10 +187,20 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
+    # JSON через orjson, ответы совпадают с JSONRenderer DRF.
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 # Password validation
@@ -0,0 +1,28 @@
+# flake8: noqa
+# Настройки для тестов (pytest, setup.cfg).
+# По умолчанию база SQLite, тесты на PostgreSQL запускаются с
+# DB_ENGINE=django.db.backends.postgresql и переменными POSTGRES_*.
+import os
+
+from .settings import *
+
+if os.getenv('DB_ENGINE', 'django.db.backends.sqlite3') == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+            # Файл, а не база в памяти: тесты с потоками открывают
+            # отдельные соединения к одной базе.
+            'TEST': {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')},
+        }
+    }
+
+CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': alias,
+    }
+    for alias in CACHES
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,82 @@
+"""
+Настройки gunicorn для production (читаются из текущей директории).
+Все значения можно переопределить переменными окружения GUNICORN_*.
+- Класс воркеров: gthread для WSGI или uvicorn при ASYNC_VIEWS=True.
+- Количество воркеров и потоков считается по доступным процессорам.
+- preload_app: приложение загружается до fork, воркеры делят
+    страницы памяти с мастером.
+- max_requests с jitter: воркеры перезапускаются по очереди,
+    а не одновременно.
+- post_worker_init: прогрев кэшей до приема запросов.
+"""
+import os
+
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '') == 'True'
+
+
+def available_cpus():
+    """
+    Процессоры, доступные процессу (с учетом cpuset контейнера).
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers(worker, cpus):
+    """
+    Синхронный воркер обрабатывает один запрос за раз, поэтому их
+    больше: 2 * CPU + 1. Потоковые и асинхронные воркеры ждут базу
+    без блокировки процесса, им достаточно CPU + 1.
+    """
+    if worker == 'sync':
+        return cpus * 2 + 1
+    return cpus + 1
+
+
+cpus = available_cpus()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8080')
+wsgi_app = (
+    'foodgram_backend.asgi:application' if ASYNC_VIEWS
+    else 'foodgram_backend.wsgi:application'
+)
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS',
+    'uvicorn.workers.UvicornWorker' if ASYNC_VIEWS else 'gthread',
+)
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', default_workers(worker_class, cpus)
+))
+threads = int(os.getenv(
+    'GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1
+))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+accesslog = os.getenv('GUNICORN_ACCESSLOG')
+errorlog = '-'
+
+
+def pre_fork(server, worker):
+    """
+    Закрывает соединения с базой, открытые в мастере при preload,
+    чтобы воркеры не унаследовали общий сокет.
+    """
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    """
+    Вызывается в воркере после fork и загрузки приложения,
+    до приема запросов.
+    """
+    from core.warmup import warm_up
+    warm_up()
+    worker.log.info('Воркер %s: кэши прогреты.', worker.pid)
@@ -1,28 +1,31 @@
+from core.admin import LargeTableAdmin
 from django.contrib import admin
 
 from .models import CustomUser, Subscription
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(LargeTableAdmin):
     list_display = (
         'username',
         'password',
         'email',
         'first_name',
-        'last_name'
+        'last_name',
+        'recipes_count',
     )
-    search_fields = ('email', 'first_name',)
-    list_filter = ('email', 'first_name',)
+    search_fields = ('username', 'email', 'first_name',)
+    list_filter = ('is_staff', 'is_active',)
     empty_value_display = '-пусто-'
 
 
 @admin.register(Subscription)
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(LargeTableAdmin):
     list_display = (
         'username',
         'author',
     )
-    search_fields = ('author',)
-    list_filter = ('author',)
+    list_select_related = ('username', 'author',)
+    autocomplete_fields = ('username', 'author',)
+    search_fields = ('username__username', 'author__username',)
     empty_value_display = '-пусто-'
@@ -0,0 +1,34 @@
+from core.async_views import AsyncAPIView
+from core.pagination import LimitPagePagination
+
+from .serializers import SubscriptionsSerializer
+from .views import CustomUserViewSet
+
+
+class AsyncSubscriptionsView(AsyncAPIView):
+    """
+    Асинхронный список подписок текущего пользователя.
+    Авторы и их рецепты загружаются так же, как в
+    CustomUserViewSet.subscriptions, через асинхронный ORM.
+    """
+    serializer_class = SubscriptionsSerializer
+    pagination_class = LimitPagePagination
+    login_required = True
+
+    async def list(self, request, *args, **kwargs):
+        authors = CustomUserViewSet.get_subscriptions(request.user)
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(authors, request, self)
+        authors = [
+            author async for author in authors
+        ] if page is None else page
+        limit = request.query_params.get('recipes_limit', '')
+        CustomUserViewSet.attach_recipes(authors, [
+            recipe async for recipe in CustomUserViewSet.get_recipes_page(
+                authors, int(limit) if limit.isdigit() else None
+            )
+        ])
+        data = await self.serialize(authors, many=True)
+        if page is not None:
+            return self.render(paginator.get_paginated_response(data).data)
+        return self.render(data)
@@ -1,9 +1,10 @@
+from core.models import QueryUpdatedFieldsMixin
 from core.validators import validate_username
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 
-class CustomUser(AbstractUser):
+class CustomUser(QueryUpdatedFieldsMixin, AbstractUser):
     username = models.CharField(
         verbose_name='Имя пользователя',
         max_length=150,
@@ -27,6 +28,13 @@ class CustomUser(AbstractUser):
         verbose_name='Фамилия',
         max_length=150,
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Количество рецептов',
+        default=0,
+        editable=False,
+    )
+
+    query_updated_fields = ('recipes_count',)
 
     class Meta:
         verbose_name = 'Пользователь'
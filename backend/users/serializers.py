@@ -54,6 +54,8 @@ class CustomUserSerializer(UserSerializer):
         :return: Флаг, указывающий, подписан ли пользователь на автора.
         :rtype: bool
         """
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
@@ -81,6 +83,8 @@ class SubscriptionsSerializer(CustomUserSerializer):
     def get_recipes(self, obj):
         """
         Возвращает список рецептов, принадлежащих пользователю.
+        Если рецепты загружены заранее (CustomUserViewSet.attach_recipes),
+        запрос не выполняется.
 
         :param obj: Объект пользователя.
         :type obj: CustomUser
@@ -88,6 +92,8 @@ class SubscriptionsSerializer(CustomUserSerializer):
         :return: Список сериализованных рецептов пользователя.
         :rtype: List[dict]
         """
+        if hasattr(obj, 'recipes_page'):
+            return RecipeSerializerForUser(obj.recipes_page, many=True).data
         limit = self.context.get('request').GET.get('recipes_limit')
         queryset = Recipe.objects.filter(author=obj)
         if limit:
@@ -104,4 +110,4 @@ class SubscriptionsSerializer(CustomUserSerializer):
         :return: Общее количество рецептов пользователя.
         :rtype: int
         """
-        return obj.recipes.count()
+        return obj.recipes_count
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.token_cache import token_cache
+from users.models import CustomUser
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """
+    Удаляет токен из кэша после выхода пользователя (djoser token/logout)
+    или удаления пользователя.
+    """
+    transaction.on_commit(lambda: token_cache.invalidate(instance.key))
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """
+    Удаляет токены пользователя из кэша после изменения пользователя:
+    смены пароля, отключения, правки профиля.
+    """
+    if created:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list(
+        'key', flat=True
+    ))
+    if keys:
+        transaction.on_commit(lambda: token_cache.invalidate(*keys))
@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import Subscription
+
+
+@pytest.fixture
+def populate(make_user):
+    """
+    Добавляет пользователей с подписками друг на друга.
+    """
+    def populate(count):
+        users = [make_user(f'user-{count}-{i}') for i in range(count)]
+        Subscription.objects.bulk_create(
+            Subscription(username=user, author=author)
+            for user in users for author in users if user != author
+        )
+    return populate
+
+
+def changelist_queries(client, model):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f'/admin/users/{model}/')
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('model', ('customuser', 'subscription'))
+def test_changelist_queries(model, staff_client, populate):
+    populate(3)
+    small = changelist_queries(staff_client, model)
+    populate(15)
+    assert changelist_queries(staff_client, model) == small
@@ -0,0 +1,81 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from rest_framework.authtoken.models import Token
+
+from core.token_cache import AUTH_TOKEN_CACHE, token_cache
+from users.models import CustomUser
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user)
+
+
+def load_token(key):
+    return Token.objects.select_related('user').get(key=key)
+
+
+def auth_get(api_client, token):
+    return api_client.get(
+        '/api/users/me/', HTTP_AUTHORIZATION=f'Token {token.key}'
+    )
+
+
+@pytest.mark.django_db
+def test_token_is_cached_in_own_alias(api_client, token):
+    assert auth_get(api_client, token).status_code == 200
+    key = token_cache.make_key(token.key)
+    assert caches[AUTH_TOKEN_CACHE].get(key)['token'][0] == token.key
+    assert caches['default'].get(key) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deactivation_invalidates_token(api_client, user, token):
+    assert auth_get(api_client, token).status_code == 200
+    user.is_active = False
+    user.save()
+    assert auth_get(api_client, token).status_code == 401
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('set_token', (
+    token_cache.set, async_to_sync(token_cache.aset),
+))
+def test_set_after_invalidate_keeps_token_out(api_client, user, token,
+                                              set_token):
+    # Запрос прочитал токен из базы, затем пользователя отключили
+    # и токен удалили из кэша, затем запрос сохраняет прочитанный токен.
+    stale = load_token(token.key)
+    user.is_active = False
+    user.save()
+    token_cache.invalidate(token.key)
+    set_token(stale)
+    assert token_cache.get(token.key) is None
+    assert async_to_sync(token_cache.aget)(token.key) is None
+    assert auth_get(api_client, token).status_code == 401
+
+
+@pytest.mark.django_db
+def test_each_request_gets_own_user(api_client, user, token):
+    assert auth_get(api_client, token).status_code == 200
+    local_hits = token_cache.local_hits
+    first = token_cache.get(token.key).user
+    first.first_name = 'Изменено в запросе'
+    second = token_cache.get(token.key).user
+    assert second is not first
+    assert second.first_name == user.first_name
+    assert token_cache.local_hits == local_hits + 2
+
+
+@pytest.mark.django_db
+def test_cached_user_keeps_counters(api_client, user, token):
+    assert auth_get(api_client, token).status_code == 200
+    CustomUser.objects.filter(id=user.id).update(recipes_count=3)
+    cached = token_cache.get(token.key).user
+    assert cached.recipes_count == 3
+    cached = token_cache.get(token.key).user
+    cached.first_name = 'Новое имя'
+    cached.save()
+    user.refresh_from_db()
+    assert (user.first_name, user.recipes_count) == ('Новое имя', 3)
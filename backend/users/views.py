@@ -1,6 +1,14 @@
+from collections import defaultdict
+
+from core.mixins import BatchActionMixin
 from core.pagination import LimitPagePagination
+from core.relations import add_relations, remove_relations
+from django.db import transaction
+from django.db.models import F, Value, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
+from foodgram.models import Recipe
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -11,9 +19,11 @@ from .serializers import (CustomUserCreateSerializer, CustomUserSerializer,
                           SubscriptionsSerializer)
 
 
-class CustomUserViewSet(UserViewSet):
+class CustomUserViewSet(BatchActionMixin, UserViewSet):
     """
     Представление для управления пользователями.
+    - `subscribe/batch` оформляет (POST) и отменяет (DELETE)
+        подписки на несколько авторов одним запросом.
     """
     queryset = CustomUser.objects.all()
     pagination_class = LimitPagePagination
@@ -95,6 +105,64 @@ class CustomUserViewSet(UserViewSet):
         data = {"errors": "Вы не подписаны на данного пользователя"}
         return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
+    def subscription_batch_response(self, ids, done, message,
+                                    self_message=None):
+        """
+        Ответ пакетного действия: для невыполненных ID сообщение
+        'message', 'self_message' для ID текущего пользователя
+        или 'Пользователь не найден.'.
+        """
+        failed = [pk for pk in ids if pk not in done]
+        existing = set(CustomUser.objects.filter(
+            id__in=failed
+        ).values_list('id', flat=True)) if failed else set()
+
+        def get_error(pk):
+            if pk not in existing:
+                return 'Пользователь не найден.'
+            if self_message and pk == self.request.user.id:
+                return self_message
+            return message
+        return self.batch_response(ids, done, get_error)
+
+    @action(
+        detail=False,
+        methods=('post',),
+        url_path='subscribe/batch',
+        permission_classes=[IsAuthenticated]
+    )
+    @transaction.atomic
+    def subscribe_batch(self, request):
+        """
+        Подписка на нескольких авторов одним запросом INSERT.
+        :param request: HTTP request object, {"ids": [...]}.
+        :return: Response с результатом для каждого автора.
+        """
+        ids = self.get_batch_ids()
+        user = request.user
+        added = add_relations(
+            Subscription, 'username', user.id, 'author',
+            [pk for pk in ids if pk != user.id],
+        )
+        return self.subscription_batch_response(
+            ids, added, 'Вы уже подписаны на этого автора',
+            'Нельзя подписываться на самого себя',
+        )
+
+    @subscribe_batch.mapping.delete
+    @transaction.atomic
+    def unsubscribe_batch(self, request):
+        """
+        Отписка от нескольких авторов.
+        """
+        ids = self.get_batch_ids()
+        removed = remove_relations(
+            Subscription, 'username', request.user.id, 'author', ids
+        )
+        return self.subscription_batch_response(
+            ids, removed, 'Вы не подписаны на данного пользователя'
+        )
+
     @action(
         detail=False,
         permission_classes=[IsAuthenticated]
@@ -105,12 +173,60 @@ class CustomUserViewSet(UserViewSet):
         :param request: HTTP request object.
         :return: Response.
         """
-        subscribing_users = request.user.subscribe.values_list(
-            'author_id', flat=True)
-        subscriptions = CustomUser.objects.filter(id__in=subscribing_users)
-        page = self.paginate_queryset(subscriptions)
+        authors = self.get_subscriptions(request.user)
+        page = self.paginate_queryset(authors)
+        authors = list(authors) if page is None else page
+        limit = request.query_params.get('recipes_limit', '')
+        self.attach_recipes(authors, self.get_recipes_page(
+            authors, int(limit) if limit.isdigit() else None
+        ))
+        serializer = self.get_serializer(authors, many=True)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(subscriptions, many=True)
         return Response(serializer.data)
+
+    @staticmethod
+    def get_subscriptions(user):
+        """
+        Возвращает авторов, на которых подписан пользователь.
+        :param user: Текущий пользователь.
+        :return: Queryset.
+        """
+        return CustomUser.objects.filter(
+            subscriber__username=user
+        ).annotate(is_subscribed=Value(True)).order_by('id')
+
+    @staticmethod
+    def get_recipes_page(authors, limit=None):
+        """
+        Возвращает рецепты авторов для загрузки одним запросом.
+        Первые 'limit' рецептов каждого автора выбираются
+        оконной функцией ROW_NUMBER() OVER (PARTITION BY author_id).
+        :param authors: Список авторов.
+        :param limit: (int): Количество рецептов на автора.
+        :return: Queryset.
+        """
+        recipes = Recipe.objects.filter(
+            author_id__in=[author.id for author in authors]
+        ).order_by('-created', '-id')
+        if limit is not None:
+            recipes = recipes.annotate(position=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=(F('created').desc(), F('id').desc()),
+            )).filter(position__lte=limit)
+        return recipes
+
+    @staticmethod
+    def attach_recipes(authors, recipes):
+        """
+        Раскладывает рецепты по авторам в атрибут 'recipes_page'.
+        :param authors: Список авторов.
+        :param recipes: Рецепты из 'get_recipes_page()'.
+        :return: None
+        """
+        by_author = defaultdict(list)
+        for recipe in recipes:
+            by_author[recipe.author_id].append(recipe)
+        for author in authors:
+            author.recipes_page = by_author[author.id]